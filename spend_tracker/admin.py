@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from spend_tracker.models import Currency, DefaultCurrency, Unit, Transaction
+from spend_tracker.models import (
+    Currency,
+    CurrencyRate,
+    DefaultCurrency,
+    Unit,
+    Transaction,
+    MonthlyUnitTotal,
+    StatementImport,
+    Notification,
+)
 
 
 @admin.register(Currency)
@@ -8,6 +17,11 @@ class CurrencyAdmin(admin.ModelAdmin):
     pass
 
 
+@admin.register(CurrencyRate)
+class CurrencyRateAdmin(admin.ModelAdmin):
+    pass
+
+
 @admin.register(DefaultCurrency)
 class DefaultCurrencyAdmin(admin.ModelAdmin):
     pass
@@ -21,3 +35,18 @@ class UnitAdmin(admin.ModelAdmin):
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(MonthlyUnitTotal)
+class MonthlyUnitTotalAdmin(admin.ModelAdmin):
+    pass
+
+
+@admin.register(StatementImport)
+class StatementImportAdmin(admin.ModelAdmin):
+    pass
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "sent_at", "attempts")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpendTrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "spend_tracker"
+
+    def ready(self):
+        from spend_tracker import signals  # noqa: F401
@@ -0,0 +1,132 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, PermissionDenied
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from spend_tracker.pagination import TransactionCursorPagination
+from spend_tracker.views import CurrencyViewSet, TransactionViewSet, UnitViewSet
+from spendlog.instrumentation import stage
+from spendlog.renderers import ORJSONRenderer
+from users.authentication import CachedJWTAuthentication
+from users.cache import get_cached_user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """JWT authentication that loads the user from the user cache in a thread."""
+
+    async def aauthenticate(self, request):
+        with stage("auth"):
+            header = self.get_header(request)
+            if header is None:
+                return None
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.get_validated_token(raw_token)
+            return await self.aget_user(validated_token)
+
+    async def aget_user(self, validated_token):
+        user = await sync_to_async(get_cached_user)(self.get_user_id(validated_token))
+        return self.check_user(user, validated_token)
+
+
+def _render(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(
+        ORJSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def async_read_view(handler):
+    """Authenticates the request, builds the viewset whose queryset and serializers
+    are reused and turns API errors into JSON responses.
+    """
+
+    async def view(request, *args, **kwargs):
+        try:
+            user = await AsyncJWTAuthentication().aauthenticate(request)
+            if user is None:
+                raise AuthenticationFailed(
+                    "Authentication credentials were not provided."
+                )
+            drf_request = Request(request)
+            drf_request.user = user
+            return await handler(drf_request, *args, **kwargs)
+        except APIException as error:
+            data = error.detail
+            if not isinstance(data, (list, dict)):
+                data = {"detail": data}
+            response = _render(data, error.status_code)
+            if error.status_code == status.HTTP_401_UNAUTHORIZED:
+                response["WWW-Authenticate"] = (
+                    AsyncJWTAuthentication().authenticate_header(request)
+                )
+            return response
+
+    return view
+
+
+def _viewset(viewset_class, request: Request, action: str, **kwargs):
+    return viewset_class(
+        request=request, action=action, format_kwarg=None, args=(), kwargs=kwargs
+    )
+
+
+async def _retrieve(viewset_class, request: Request, pk: int) -> HttpResponse:
+    view = _viewset(viewset_class, request, "retrieve", pk=pk)
+    try:
+        instance = await view.get_queryset().aget(pk=pk)
+    except view.get_queryset().model.DoesNotExist:
+        raise NotFound()
+    return _render(view.get_serializer(instance).data)
+
+
+async def _list(viewset_class, request: Request) -> HttpResponse:
+    view = _viewset(viewset_class, request, "list")
+    instances = [instance async for instance in view.get_queryset()]
+    return _render(view.get_serializer(instances, many=True).data)
+
+
+@async_read_view
+async def transaction_list(request: Request) -> HttpResponse:
+    """Keyset-paginated transactions on `(date_time, id)`, read with the async ORM.
+    Pages and cursors are the same as those of the synchronous list.
+    """
+    view = _viewset(TransactionViewSet, request, "list")
+    paginator = TransactionCursorPagination()
+    query = paginator.get_page_query(view.get_queryset(), request)
+    instances = paginator.get_page([instance async for instance in query])
+    results = view.get_serializer(instances, many=True).data
+    return _render(paginator.get_paginated_data(results))
+
+
+@async_read_view
+async def transaction_detail(request: Request, pk: int) -> HttpResponse:
+    return await _retrieve(TransactionViewSet, request, pk)
+
+
+@async_read_view
+async def unit_list(request: Request) -> HttpResponse:
+    return await _list(UnitViewSet, request)
+
+
+@async_read_view
+async def unit_detail(request: Request, pk: int) -> HttpResponse:
+    return await _retrieve(UnitViewSet, request, pk)
+
+
+@async_read_view
+async def currency_list(request: Request) -> HttpResponse:
+    if not request.user.is_staff:
+        raise PermissionDenied()
+    return await _list(CurrencyViewSet, request)
+
+
+@async_read_view
+async def currency_detail(request: Request, pk: int) -> HttpResponse:
+    if not request.user.is_staff:
+        raise PermissionDenied()
+    return await _retrieve(CurrencyViewSet, request, pk)
@@ -0,0 +1,94 @@
+import decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from spend_tracker.helpers.export import filter_date_range
+from spend_tracker.models import Unit
+
+
+def _get_int(params, name: str) -> int | None:
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: [f"Invalid value '{value}', expected an id."]})
+
+
+def _get_decimal(params, name: str) -> decimal.Decimal | None:
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return decimal.Decimal(value)
+    except decimal.InvalidOperation:
+        raise ValidationError({name: [f"Invalid value '{value}', expected a number."]})
+
+
+def _get_unit_type(params) -> str | None:
+    value = params.get("unit_type")
+    if not value:
+        return None
+    unit_type = value.upper()
+    if unit_type not in dict(Unit.UNIT_TYPE_CHOICES):
+        raise ValidationError({"unit_type": [f"Invalid unit type '{value}'."]})
+    return unit_type
+
+
+def filter_units(queryset, params):
+    """Filters units with `unit_type`, `currency` (name) and `search` (name)."""
+    unit_type = _get_unit_type(params)
+    if unit_type:
+        queryset = queryset.filter(unit_type=unit_type)
+    if params.get("currency"):
+        queryset = queryset.filter(currency__name=params["currency"].upper())
+    if params.get("search"):
+        queryset = queryset.filter(name__icontains=params["search"])
+    return queryset
+
+
+def filter_transactions(queryset, params, user=None):
+    """Filters transactions with the query parameters:
+    `date_from` and `date_to` (`YYYY-MM-DD`), `unit` (source or destination),
+    `source_unit`, `destination_unit`, `unit_type` and `currency` of either unit,
+    and `amount_min` and `amount_max` on the source amount.
+    Pass `user` to look up matching units among that user's units only.
+    """
+    queryset = filter_date_range(
+        queryset, params.get("date_from"), params.get("date_to")
+    )
+
+    unit = _get_int(params, "unit")
+    if unit:
+        queryset = queryset.filter(Q(source_unit_id=unit) | Q(destination_unit_id=unit))
+    source_unit = _get_int(params, "source_unit")
+    if source_unit:
+        queryset = queryset.filter(source_unit_id=source_unit)
+    destination_unit = _get_int(params, "destination_unit")
+    if destination_unit:
+        queryset = queryset.filter(destination_unit_id=destination_unit)
+
+    # Matching units are resolved first, so both unit columns are looked up by index
+    unit_type = _get_unit_type(params)
+    currency = params.get("currency")
+    if unit_type or currency:
+        units = Unit.objects.filter(user=user) if user else Unit.objects.all()
+        if unit_type:
+            units = units.filter(unit_type=unit_type)
+        if currency:
+            units = units.filter(currency__name=currency.upper())
+        unit_ids = units.values("id")
+        queryset = queryset.filter(
+            Q(source_unit_id__in=unit_ids) | Q(destination_unit_id__in=unit_ids)
+        )
+
+    amount_min = _get_decimal(params, "amount_min")
+    if amount_min is not None:
+        queryset = queryset.filter(source_amount__gte=amount_min)
+    amount_max = _get_decimal(params, "amount_max")
+    if amount_max is not None:
+        queryset = queryset.filter(source_amount__lte=amount_max)
+
+    return queryset
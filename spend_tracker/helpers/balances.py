@@ -0,0 +1,216 @@
+import decimal
+from collections import defaultdict
+
+from django.db.models import F, Sum
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.rollups import apply_rollup_deltas, merge_rollup_deltas
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import Transaction, Unit
+
+AMOUNT_QUANTUM = decimal.Decimal("0.01")
+# Fields a transaction's balance and monthly deltas are computed from
+LEDGER_FIELDS = (
+    "date_time",
+    "source_unit_id",
+    "destination_unit_id",
+    "source_amount",
+    "destination_amount",
+)
+
+
+class TransactionChanged(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A transaction was changed or deleted by another request."
+    default_code = "transaction_changed"
+
+
+def get_balance_deltas(
+    source_unit: Unit,
+    destination_unit: Unit,
+    source_amount: decimal.Decimal,
+    destination_amount: decimal.Decimal,
+) -> dict[int, decimal.Decimal]:
+    """Returns the change of `Unit.amount` per unit id caused by a transaction."""
+    deltas = defaultdict(decimal.Decimal)
+
+    # Operation for INCOME -> ACCOUNT
+    if source_unit.unit_type == "INCOME" and destination_unit.unit_type == "ACCOUNT":
+        deltas[source_unit.id] += source_amount
+        deltas[destination_unit.id] += destination_amount
+
+    # Operation for ACCOUNT -> ACCOUNT/EXPENSE
+    elif source_unit.unit_type == "ACCOUNT" and destination_unit.unit_type in (
+        "ACCOUNT",
+        "EXPENSE",
+    ):
+        deltas[source_unit.id] -= source_amount
+        deltas[destination_unit.id] += destination_amount
+
+    else:
+        raise ValidationError("Invalid transaction type combination.")
+
+    return deltas
+
+
+def merge_balance_deltas(total: dict, deltas: dict, sign: int = 1) -> None:
+    """Adds `deltas` to `total` in place, negated when `sign` is -1."""
+    for unit_id, delta in deltas.items():
+        total[unit_id] = total.get(unit_id, decimal.Decimal(0)) + sign * delta
+
+
+def get_transaction_deltas(instance: Transaction) -> dict[int, decimal.Decimal]:
+    """Returns the balance deltas of an already saved transaction."""
+    return get_balance_deltas(
+        source_unit=instance.source_unit,
+        destination_unit=instance.destination_unit,
+        source_amount=instance.source_amount,
+        destination_amount=instance.destination_amount,
+    )
+
+
+def lock_transactions(ids) -> dict[int, Transaction]:
+    """Reads transactions again inside a write block, locking their rows on
+    databases that support it. Reversals must be computed from these rows, as
+    rows loaded before the block may have been changed or deleted since.
+    """
+    return (
+        Transaction.objects.select_related("user", "source_unit", "destination_unit")
+        .select_for_update(of=("self",))
+        .in_bulk(ids)
+    )
+
+
+def apply_balance_deltas(deltas: dict) -> None:
+    """Applies balance deltas as database-side increments.
+    Each unit gets `amount = amount + delta` instead of a read-modify-write,
+    so concurrent writers never lose each other's updates. Units are updated
+    in ascending id order, so databases with row locks never deadlock on lock
+    order. SQLite locks the whole database for any write, so there writers
+    still run one at a time.
+    """
+    for unit_id in sorted(deltas):
+        if deltas[unit_id]:
+            Unit.objects.filter(id=unit_id).update(amount=F("amount") + deltas[unit_id])
+
+
+def get_expected_balances(units) -> dict[int, decimal.Decimal]:
+    """Recomputes `Unit.amount` for a unit queryset from the ledger with grouped aggregates.
+    INCOME units grow with outgoing transactions, the other types shrink.
+    """
+    unit_types = dict(units.values_list("id", "unit_type"))
+    outgoing = _sum_by_unit("source_unit", "source_amount", units)
+    incoming = _sum_by_unit("destination_unit", "destination_amount", units)
+
+    zero = decimal.Decimal(0)
+    return {
+        unit_id: (
+            incoming.get(unit_id, zero)
+            + (1 if unit_type == "INCOME" else -1) * outgoing.get(unit_id, zero)
+        ).quantize(AMOUNT_QUANTUM)
+        for unit_id, unit_type in unit_types.items()
+    }
+
+
+def _sum_by_unit(unit_field: str, amount_field: str, units) -> dict:
+    return dict(
+        Transaction.objects.filter(**{f"{unit_field}__in": units.values("id")})
+        .values(unit_field)
+        .annotate(total=Sum(amount_field))
+        .values_list(unit_field, "total")
+    )
+
+
+@immediate_atomic()
+def apply_transaction_batch(
+    user, creates: list[dict], updates: list[tuple], deletes: list[Transaction]
+) -> tuple[list[Transaction], list[Transaction]]:
+    """Writes a batch of transaction changes in one atomic block.
+    `creates` holds validated data, `updates` holds `(instance, validated_data)` pairs.
+    The changes are merged first, so every affected unit gets one increment.
+    Raises `TransactionChanged` when an updated or deleted transaction no longer
+    matches the instance it was validated against.
+    """
+    current = lock_transactions(
+        [instance.id for instance, _ in updates] + [instance.id for instance in deletes]
+    )
+    for instance in [instance for instance, _ in updates] + deletes:
+        stored = current.get(instance.id)
+        if stored is None or any(
+            getattr(stored, field) != getattr(instance, field)
+            for field in LEDGER_FIELDS
+        ):
+            raise TransactionChanged(
+                f"Transaction {instance.id} was changed or deleted by another "
+                "request, the batch was not applied."
+            )
+    updates = [(current[instance.id], data) for instance, data in updates]
+    deletes = [current[instance.id] for instance in deletes]
+
+    deltas = {}
+    rollups = defaultdict(dict)
+    create_deltas = [get_balance_deltas(**_amount_fields(data)) for data in creates]
+    for change in create_deltas:
+        merge_balance_deltas(deltas, change)
+    for instance, data in updates:
+        change = {}
+        merge_balance_deltas(change, get_transaction_deltas(instance), sign=-1)
+        merge_balance_deltas(change, get_balance_deltas(**_amount_fields(data)))
+        merge_balance_deltas(deltas, change)
+        merge_rollup_deltas(
+            rollups[instance.user_id],
+            change,
+            instance.date_time,
+            tz=instance.user.timezone,
+        )
+    for instance in deletes:
+        change = get_transaction_deltas(instance)
+        merge_balance_deltas(deltas, change, sign=-1)
+        merge_rollup_deltas(
+            rollups[instance.user_id],
+            change,
+            instance.date_time,
+            sign=-1,
+            tz=instance.user.timezone,
+        )
+
+    apply_balance_deltas(deltas)
+
+    created = Transaction.objects.bulk_create(
+        [Transaction(user=user, **data) for data in creates]
+    )
+    for instance, change in zip(created, create_deltas):
+        merge_rollup_deltas(
+            rollups[user.id], change, instance.date_time, tz=user.timezone
+        )
+    for user_id, rollup in rollups.items():
+        apply_rollup_deltas(user_id, rollup)
+        bump_units_version_on_commit(user_id)
+
+    updated = []
+    for instance, data in updates:
+        for field, value in data.items():
+            setattr(instance, field, value)
+        updated.append(instance)
+    Transaction.objects.bulk_update(
+        updated,
+        ["source_unit", "destination_unit", "source_amount", "destination_amount"],
+    )
+
+    deleted, _ = Transaction.objects.filter(
+        id__in=[instance.id for instance in deletes]
+    ).delete()
+    if deleted != len(deletes):
+        raise TransactionChanged()
+    return created, updated
+
+
+def _amount_fields(data: dict) -> dict:
+    return {
+        "source_unit": data["source_unit"],
+        "destination_unit": data["destination_unit"],
+        "source_amount": data["source_amount"],
+        "destination_amount": data["destination_amount"],
+    }
@@ -0,0 +1,7 @@
+import math
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Returns the nearest-rank `percent` percentile of `values`."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
@@ -1,45 +1,91 @@
 import decimal
-import os
 from datetime import datetime
 
-import requests
+from django.db import transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
-from spend_tracker.helpers.telegram import send_telegram_message
-from spend_tracker.models import Currency
-from dotenv import load_dotenv
+from spend_tracker.helpers.currency_registry import bump_rates_version, registry
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.rate_providers import fetch_rates, remember_validators
+from spend_tracker.helpers.notifications import queue_notification
+from spend_tracker.models import Currency, CurrencyRate
 
 
-load_dotenv()
+RATE_QUANTUM = decimal.Decimal("0.000001")
 
 
-url = os.getenv("EXCHANGE_RATES_API_URL")
-access_key = os.getenv("EXCHANGE_RATES_API_ACCESS_KEY")
+def normalize_rate(rate) -> decimal.Decimal:
+    """Converts a raw API rate to the precision stored in `Currency.rate`."""
+    return decimal.Decimal(str(rate)).quantize(RATE_QUANTUM)
 
 
-def get_currencies_from_api() -> dict | None:
-    """Fetches currency exchange rates from an external API."""
-    response = requests.get(url, params={"access_key": access_key})
-    if response.status_code != 200:
-        return None
-    return response.json().get("rates", None)
+@immediate_atomic()
+def save_currency_rates(rates: dict, effective_at: datetime | None = None) -> dict:
+    """Writes currency rates in one transaction, touching only rows that changed.
+    Every new or changed rate is also appended to the rate history.
+    Returns the number of inserted, updated and unchanged rows.
+    """
+    existing = {currency.name: currency for currency in Currency.objects.all()}
+    to_create = []
+    to_update = []
 
+    for currency_name, currency_rate in rates.items():
+        rate = normalize_rate(currency_rate)
+        currency = existing.get(currency_name)
+        if currency is None:
+            to_create.append(Currency(name=currency_name, rate=rate))
+        elif currency.rate != rate:
+            currency.rate = rate
+            to_update.append(currency)
 
-def update_or_create_currencies_in_db() -> None:
-    """Fetches currency rates from an external API and updates or creates currency records in the database."""
-    currencies_from_api = get_currencies_from_api()
-    if currencies_from_api:
-        for currency_name, currency_rate in currencies_from_api.items():
-            Currency.objects.update_or_create(
-                name=currency_name, defaults={"rate": currency_rate}
+    if to_create:
+        Currency.objects.bulk_create(to_create)
+    if to_update:
+        Currency.objects.bulk_update(to_update, ["rate"])
+    if to_create or to_update:
+        effective_at = effective_at or timezone.now()
+        CurrencyRate.objects.bulk_create(
+            CurrencyRate(
+                currency=currency, rate=currency.rate, effective_at=effective_at
             )
-        send_telegram_message(
-            f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nCurrencies Updated"
+            for currency in to_create + to_update
+        )
+        transaction.on_commit(bump_rates_version)
+
+    return {
+        "inserted": len(to_create),
+        "updated": len(to_update),
+        "unchanged": len(rates) - len(to_create) - len(to_update),
+    }
+
+
+def update_or_create_currencies_in_db() -> dict | None:
+    """Fetches currency rates from an external API and updates or creates currency records in the database."""
+    result = fetch_rates()
+    if result and result.not_modified:
+        counts = {"inserted": 0, "updated": 0, "unchanged": len(registry.all())}
+        queue_notification(
+            f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Currencies Not Modified ({result.provider})"
         )
+        return counts
+    elif result:
+        counts = save_currency_rates(result.rates)
+        remember_validators(result)
+        queue_notification(
+            f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Currencies Updated ({result.provider})\n"
+            f"Inserted: {counts['inserted']}, "
+            f"Updated: {counts['updated']}, "
+            f"Unchanged: {counts['unchanged']}"
+        )
+        return counts
     else:
-        send_telegram_message(
+        queue_notification(
             f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nCurrencies NOT Updated"
         )
+        return None
 
 
 def convert_currencies(
@@ -51,3 +97,17 @@ def convert_currencies(
     if from_currency == to_currency:
         return amount
     return amount * (to_currency.rate / from_currency.rate)
+
+
+def convert_currencies_as_of(
+    amount: decimal.Decimal,
+    from_currency: Currency,
+    to_currency: Currency,
+    at: datetime,
+) -> decimal.Decimal:
+    """Converts a monetary amount with the rates that were effective at `at`."""
+    if from_currency == to_currency:
+        return amount
+    from_rate = registry.rate_as_of(from_currency.id, at)
+    to_rate = registry.rate_as_of(to_currency.id, at)
+    return amount * (to_rate / from_rate)
@@ -0,0 +1,147 @@
+import datetime
+import decimal
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from spend_tracker.models import Currency, CurrencyRate
+
+
+RATES_VERSION_KEY = "spend_tracker:currency_rates_version"
+# Seconds a process trusts its registry before checking the shared version again
+VERSION_CHECK_INTERVAL = 5
+# Months of one currency's rate history kept, least recently used ones are dropped
+MAX_HISTORY_WINDOWS = 512
+
+
+def get_rates_version() -> int:
+    """Returns the shared version of the currency rates, creating it if missing."""
+    return cache.get_or_set(RATES_VERSION_KEY, 1, timeout=None)
+
+
+def bump_rates_version() -> int:
+    """Invalidates every process-local registry by incrementing the shared version.
+    Other processes notice within `VERSION_CHECK_INTERVAL` seconds.
+    """
+    try:
+        version = cache.incr(RATES_VERSION_KEY)
+    except ValueError:
+        cache.add(RATES_VERSION_KEY, 2, timeout=None)
+        version = cache.get(RATES_VERSION_KEY)
+    registry.clear()
+    return version
+
+
+class CurrencyRegistry:
+    """Process-local copy of the `Currency` table and of the rate history that
+    is used. Reloaded only when the shared rates version changes, so lookups
+    and conversions make no database queries between rate updates. The version
+    itself is checked at most every `VERSION_CHECK_INTERVAL` seconds, so
+    lookups make no cache round-trips either.
+    History is loaded a month of one currency at a time, when a rate of that
+    month is needed, so neither memory nor reloads grow with the table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._by_id = {}
+        self._by_name = {}
+        self._history = OrderedDict()
+
+    def _load(self) -> None:
+        now = time.monotonic()
+        if (
+            self._version is not None
+            and now - self._checked_at < VERSION_CHECK_INTERVAL
+        ):
+            return
+        version = get_rates_version()
+        if version == self._version:
+            self._checked_at = now
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            currencies = list(Currency.objects.order_by("name"))
+            self._by_id = {currency.id: currency for currency in currencies}
+            self._by_name = {currency.name: currency for currency in currencies}
+            self._history.clear()
+            self._version = version
+            self._checked_at = now
+
+    def _load_history(self, pk: int, at: datetime.datetime) -> tuple[list, list]:
+        """Returns the dates and rates of the snapshots of currency `pk` in the
+        UTC month of `at`, preceded by the one effective when the month started.
+        When there is none before the month end, the earliest later snapshot is
+        used, so dates before the first snapshot get the earliest rate.
+        """
+        at = at.astimezone(datetime.timezone.utc)
+        start = at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+        key = (pk, start)
+        with self._lock:
+            window = self._history.get(key)
+            if window is not None:
+                self._history.move_to_end(key)
+                return window
+
+            snapshots = CurrencyRate.objects.filter(currency_id=pk).values_list(
+                "effective_at", "rate"
+            )
+            rows = list(
+                snapshots.filter(effective_at__lt=start).order_by("-effective_at")[:1]
+            )
+            rows += snapshots.filter(
+                effective_at__gte=start, effective_at__lt=end
+            ).order_by("effective_at")
+            if not rows:
+                rows = list(
+                    snapshots.filter(effective_at__gte=end).order_by("effective_at")[:1]
+                )
+            window = ([date for date, _ in rows], [rate for _, rate in rows])
+            self._history[key] = window
+            while len(self._history) > MAX_HISTORY_WINDOWS:
+                self._history.popitem(last=False)
+            return window
+
+    def all(self) -> list[Currency]:
+        self._load()
+        return list(self._by_id.values())
+
+    def get(self, pk) -> Currency | None:
+        self._load()
+        try:
+            return self._by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name: str) -> Currency | None:
+        self._load()
+        return self._by_name.get(name)
+
+    def rate_as_of(self, pk: int, at: datetime.datetime) -> decimal.Decimal | None:
+        """Returns the rate that was effective at `at`.
+        Dates before the first snapshot use the earliest one, and currencies
+        without history use their current rate.
+        """
+        self._load()
+        dates, rates = self._load_history(pk, at)
+        if not rates:
+            currency = self._by_id.get(pk)
+            return currency.rate if currency else None
+        return rates[max(bisect_right(dates, at) - 1, 0)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._by_id = {}
+            self._by_name = {}
+            self._history.clear()
+
+
+registry = CurrencyRegistry()
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """`transaction.atomic` for blocks that read and then write, such as balance
+    updates. On SQLite the outermost block starts with `BEGIN IMMEDIATE`, so it
+    waits on the busy timeout for the write lock instead of failing with
+    "database is locked" when its read lock cannot be upgraded. Other atomic
+    blocks keep the default deferred mode, so read-only ones never take the
+    write lock.
+    """
+    connection = transaction.get_connection(using)
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # Connecting reads `transaction_mode` from the settings, so connect first
+    connection.ensure_connection()
+    default_mode = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = default_mode
+            yield
+    finally:
+        connection.transaction_mode = default_mode
@@ -0,0 +1,95 @@
+import csv
+import datetime
+import json
+from typing import Iterable, Iterator
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_COLUMNS = {
+    "id": "id",
+    "date_time": "date_time",
+    "source_unit": "source_unit__name",
+    "source_currency": "source_unit__currency__name",
+    "source_amount": "source_amount",
+    "destination_unit": "destination_unit__name",
+    "destination_currency": "destination_unit__currency__name",
+    "destination_amount": "destination_amount",
+    "user": "user__email",
+}
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object that returns what is written instead of buffering it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def parse_date_range(
+    date_from: str | None, date_to: str | None
+) -> tuple[datetime.datetime | None, datetime.datetime | None]:
+    """Converts inclusive `YYYY-MM-DD` dates to a half-open range of aware datetimes."""
+    bounds = []
+    for value, days in ((date_from, 0), (date_to, 1)):
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            date = datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+        bounds.append(
+            timezone.make_aware(
+                datetime.datetime.combine(
+                    date + datetime.timedelta(days=days), datetime.time.min
+                )
+            )
+        )
+    return bounds[0], bounds[1]
+
+
+def filter_date_range(queryset, date_from: str | None, date_to: str | None):
+    start, end = parse_date_range(date_from, date_to)
+    if start:
+        queryset = queryset.filter(date_time__gte=start)
+    if end:
+        queryset = queryset.filter(date_time__lt=end)
+    return queryset
+
+
+def iter_export_rows(queryset) -> Iterator[dict]:
+    """Reads transactions in chunks with their units, currencies and users joined in."""
+    rows = queryset.values_list(*EXPORT_COLUMNS.values()).iterator(
+        chunk_size=CHUNK_SIZE
+    )
+    for row in rows:
+        row = dict(zip(EXPORT_COLUMNS, row))
+        row["date_time"] = timezone.localtime(row["date_time"]).isoformat()
+        row["source_amount"] = str(row["source_amount"])
+        row["destination_amount"] = str(row["destination_amount"])
+        yield row
+
+
+def iter_csv(rows: Iterable[dict]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=list(EXPORT_COLUMNS))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def export_transactions(queryset, output: str) -> Iterator[str]:
+    """Streams a transaction queryset as CSV or NDJSON lines."""
+    if output not in EXPORT_FORMATS:
+        raise ValidationError(
+            f"Invalid output '{output}', expected one of: {', '.join(EXPORT_FORMATS)}."
+        )
+    rows = iter_export_rows(queryset)
+    return iter_csv(rows) if output == "csv" else iter_ndjson(rows)
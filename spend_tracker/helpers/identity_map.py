@@ -0,0 +1,57 @@
+from spend_tracker.helpers.currency_registry import registry
+from spend_tracker.models import Currency, DefaultCurrency, Unit
+
+
+class UserIdentityMap:
+    """Loads a user's units and default currency at most once per request.
+    Currencies come from the process-local registry, so resolving a unit and its
+    currency never makes more than the first query.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._units = None
+        self._default_currency_loaded = False
+        self._default_currency = None
+
+    @property
+    def units(self) -> dict[int, Unit]:
+        if self._units is None:
+            units = Unit.objects.filter(user=self.user).order_by("unit_type", "id")
+            currencies = {currency.id: currency for currency in registry.all()}
+            self._units = {}
+            for unit in units:
+                currency = currencies.get(unit.currency_id)
+                if currency is not None:
+                    unit.currency = currency
+                self._units[unit.id] = unit
+        return self._units
+
+    def get_unit(self, pk) -> Unit | None:
+        try:
+            return self.units.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def default_currency(self) -> Currency | None:
+        if not self._default_currency_loaded:
+            default_currency_id = (
+                DefaultCurrency.objects.filter(user=self.user)
+                .values_list("default_currency_id", flat=True)
+                .first()
+            )
+            self._default_currency = registry.get(default_currency_id)
+            self._default_currency_loaded = True
+        return self._default_currency
+
+
+def get_identity_map(request) -> UserIdentityMap | None:
+    """Returns the identity map of the request's user, creating it on first use."""
+    if request is None or not request.user.is_authenticated:
+        return None
+    identity_map = getattr(request, "_spend_tracker_identity_map", None)
+    if identity_map is None or identity_map.user != request.user:
+        identity_map = UserIdentityMap(request.user)
+        request._spend_tracker_identity_map = identity_map
+    return identity_map
@@ -0,0 +1,62 @@
+import decimal
+
+from django.core.cache import cache
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from spend_tracker.helpers.currency_registry import get_rates_version
+from spend_tracker.helpers.versions import get_units_version
+from spend_tracker.models import DefaultCurrency, Unit
+
+AMOUNT_QUANTUM = decimal.Decimal("0.01")
+
+
+def _cache_key(user_id: int) -> str:
+    return (
+        f"spend_tracker:net_worth:{user_id}:"
+        f"{get_units_version(user_id)}:{get_rates_version()}"
+    )
+
+
+def calculate_net_worth(user) -> dict:
+    """Totals per unit type and net worth in the user's default currency, in one query.
+    Net worth is the sum of ACCOUNT units that are `in_balance`.
+    Without a default currency amounts are expressed in the rates' base currency.
+    """
+    default_currency = DefaultCurrency.objects.filter(user=OuterRef("user"))
+    default_rate = Coalesce(
+        Subquery(default_currency.values("default_currency__rate")[:1]),
+        Value(decimal.Decimal(1)),
+        output_field=DecimalField(),
+    )
+    converted = F("amount") * default_rate / F("currency__rate")
+
+    units = (
+        Unit.objects.filter(user=user)
+        .values("user")
+        .annotate(
+            currency_name=Subquery(
+                default_currency.values("default_currency__name")[:1]
+            ),
+            income=Sum(converted, filter=Q(unit_type="INCOME")),
+            expense=Sum(converted, filter=Q(unit_type="EXPENSE")),
+            account=Sum(converted, filter=Q(unit_type="ACCOUNT")),
+            net_worth=Sum(converted, filter=Q(unit_type="ACCOUNT", in_balance=True)),
+        )
+    )
+    totals = next(iter(units), {})
+
+    result = {"currency": totals.get("currency_name")}
+    for field in ("income", "expense", "account", "net_worth"):
+        result[field] = decimal.Decimal(totals.get(field) or 0).quantize(AMOUNT_QUANTUM)
+    return result
+
+
+def get_net_worth(user) -> dict:
+    """Returns the cached net worth, recalculating it after any unit, default currency or rate change."""
+    key = _cache_key(user.id)
+    result = cache.get(key)
+    if result is None:
+        result = calculate_net_worth(user)
+        cache.set(key, result, timeout=60 * 60)
+    return result
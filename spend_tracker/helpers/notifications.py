@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from spend_tracker.helpers.telegram import MAX_MESSAGE_LENGTH, send_telegram_message
+from spend_tracker.models import Notification
+
+
+# Delay before draining, so bursts of notifications are sent as one message
+COALESCE_DELAY = 10
+DRAIN_LOCK_KEY = "spend_tracker:notifications:drain_lock"
+DRAIN_LOCK_TIMEOUT = 5 * 60
+SEPARATOR = "\n\n"
+
+
+def queue_notification(message: str) -> Notification:
+    """Stores a notification in the outbox and schedules its delivery after commit.
+    Never waits on, or fails because of, the chat API.
+    """
+    from spend_tracker.tasks import send_notifications
+
+    notification = Notification.objects.create(message=message[:MAX_MESSAGE_LENGTH])
+    transaction.on_commit(
+        lambda: send_notifications.apply_async(countdown=COALESCE_DELAY),
+        robust=True,
+    )
+    return notification
+
+
+def take_batch(pending: list[Notification]) -> list[Notification]:
+    """Returns the leading notifications that fit into one chat message."""
+    batch = pending[:1]
+    length = len(pending[0].message)
+    for notification in pending[1:]:
+        length += len(SEPARATOR) + len(notification.message)
+        if length > MAX_MESSAGE_LENGTH:
+            break
+        batch.append(notification)
+    return batch
+
+
+def drain_outbox(limit: int = 500) -> int:
+    """Sends pending notifications, oldest first, and returns how many were sent.
+    Only one drain runs at a time. On failure the unsent notifications stay in
+    the outbox and the error is re-raised, so the caller can retry.
+    """
+    if not cache.add(DRAIN_LOCK_KEY, 1, timeout=DRAIN_LOCK_TIMEOUT):
+        return 0
+    try:
+        pending = list(
+            Notification.objects.filter(sent_at__isnull=True).order_by("id")[:limit]
+        )
+        sent = 0
+        while pending:
+            batch = take_batch(pending)
+            ids = [notification.id for notification in batch]
+            try:
+                send_telegram_message(
+                    SEPARATOR.join(notification.message for notification in batch)
+                )
+            except Exception as error:
+                Notification.objects.filter(id__in=ids).update(
+                    attempts=F("attempts") + 1, last_error=str(error)
+                )
+                raise
+            Notification.objects.filter(id__in=ids).update(sent_at=timezone.now())
+            pending = pending[len(batch) :]
+            sent += len(batch)
+        return sent
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
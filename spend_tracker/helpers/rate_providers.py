@@ -0,0 +1,159 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+import requests
+from django.core.cache import cache
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (3.05, 10)
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+)
+
+# Provider name: session, kept for the life of the process
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class FetchResult(NamedTuple):
+    provider: str
+    rates: dict | None
+    not_modified: bool = False
+    validators: dict | None = None
+
+
+def get_session(provider: str) -> requests.Session:
+    """Returns the session of a provider. It lives as long as the process, so its
+    pooled connections are reused by every fetch, whichever thread runs it.
+    """
+    with _sessions_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=RETRY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[provider] = session
+        return session
+
+
+class RateProvider:
+    """An exchange rates API that answers with `{"rates": {"USD": 1.08, ...}}`.
+    ETag and Last-Modified validators are remembered so unchanged rates are not downloaded again.
+    """
+
+    def __init__(self, name: str, url: str, params: dict | None = None):
+        self.name = name
+        self.url = url
+        self.params = params or {}
+
+    def fetch(self) -> FetchResult:
+        headers = {}
+        validators = cache.get(_validators_key(self.name)) or {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            response = get_session(self.name).get(
+                self.url, params=self.params, headers=headers, timeout=TIMEOUT
+            )
+        except requests.RequestException:
+            return FetchResult(self.name, None)
+
+        if response.status_code == 304:
+            return FetchResult(self.name, None, not_modified=True)
+        if response.status_code != 200:
+            return FetchResult(self.name, None)
+
+        try:
+            rates = response.json().get("rates")
+        except (ValueError, AttributeError):
+            return FetchResult(self.name, None)
+        if not is_valid_rates(rates):
+            return FetchResult(self.name, None)
+
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return FetchResult(self.name, rates, validators=validators)
+
+
+def _validators_key(provider: str) -> str:
+    return f"spend_tracker:rate_provider:{provider}:validators"
+
+
+def remember_validators(result: FetchResult) -> None:
+    """Stores the ETag and Last-Modified of a download once its rates are saved."""
+    if result.validators:
+        cache.set(_validators_key(result.provider), result.validators, timeout=None)
+
+
+def is_valid_rates(rates) -> bool:
+    return (
+        isinstance(rates, dict)
+        and bool(rates)
+        and all(
+            isinstance(name, str)
+            and isinstance(rate, (int, float))
+            and not isinstance(rate, bool)
+            and rate > 0
+            for name, rate in rates.items()
+        )
+    )
+
+
+def get_providers() -> list[RateProvider]:
+    """Builds providers from the environment.
+    `EXCHANGE_RATES_FALLBACK_API_URLS` is a comma-separated list of extra endpoints;
+    they must quote rates against the same base currency as the primary API.
+    """
+    providers = []
+    if os.getenv("EXCHANGE_RATES_API_URL"):
+        providers.append(
+            RateProvider(
+                "primary",
+                os.getenv("EXCHANGE_RATES_API_URL"),
+                {"access_key": os.getenv("EXCHANGE_RATES_API_ACCESS_KEY")},
+            )
+        )
+    fallback_urls = os.getenv("EXCHANGE_RATES_FALLBACK_API_URLS", "")
+    for index, url in enumerate(filter(None, map(str.strip, fallback_urls.split(",")))):
+        providers.append(RateProvider(f"fallback-{index}", url))
+    return providers
+
+
+def fetch_rates(providers: list[RateProvider] | None = None) -> FetchResult | None:
+    """Queries all providers concurrently and returns the first valid answer.
+    A 304 counts as valid: the rates have not changed since the last download.
+    Returns None when every provider fails.
+    """
+    providers = get_providers() if providers is None else providers
+    if not providers:
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=len(providers))
+    try:
+        pending = {executor.submit(provider.fetch) for provider in providers}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.rates is not None or result.not_modified:
+                    return result
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import Exists, F, Max, Min, OuterRef
+
+from spend_tracker.helpers.balances import get_expected_balances
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import Transaction, Unit
+
+
+def get_user_id_ranges(shards: int) -> list[tuple[int, int]]:
+    """Splits the user id space into at most `shards` half-open `[start, end)` ranges."""
+    bounds = get_user_model().objects.aggregate(first=Min("id"), last=Max("id"))
+    if bounds["first"] is None:
+        return []
+    first, last = bounds["first"], bounds["last"] + 1
+    step = max(1, -(-(last - first) // max(1, shards)))
+    return [(start, min(start + step, last)) for start in range(first, last, step)]
+
+
+def find_drift(user_id_start: int, user_id_end: int) -> list[dict]:
+    """Compares `Unit.amount` with the ledger for the users in `[start, end)`.
+    Units without transactions are left out: their amount can only have been
+    set directly, as an opening balance, and must not be repaired to zero.
+    """
+    units = Unit.objects.filter(
+        Exists(Transaction.objects.filter(source_unit=OuterRef("pk")))
+        | Exists(Transaction.objects.filter(destination_unit=OuterRef("pk"))),
+        user_id__gte=user_id_start,
+        user_id__lt=user_id_end,
+    )
+    with transaction.atomic():
+        recorded = dict(units.values_list("id", "amount"))
+        expected = get_expected_balances(units)
+    return [
+        {"unit": unit_id, "amount": amount, "expected": expected[unit_id]}
+        for unit_id, amount in recorded.items()
+        if amount != expected[unit_id]
+    ]
+
+
+@immediate_atomic()
+def repair_drift(drift: list[dict]) -> None:
+    """Corrects drifted balances with a database-side delta, so writes that
+    happened after the drift was measured are preserved.
+    """
+    for item in sorted(drift, key=lambda item: item["unit"]):
+        Unit.objects.filter(id=item["unit"]).update(
+            amount=F("amount") + (item["expected"] - item["amount"])
+        )
+    user_ids = Unit.objects.filter(id__in=[item["unit"] for item in drift]).values_list(
+        "user_id", flat=True
+    )
+    for user_id in set(user_ids):
+        bump_units_version_on_commit(user_id)
+
+
+def reconcile_user_range(
+    user_id_start: int, user_id_end: int, repair: bool = False
+) -> list[dict]:
+    """Finds and optionally repairs drift for one shard of users."""
+    drift = find_drift(user_id_start, user_id_end)
+    if repair and drift:
+        repair_drift(drift)
+    return drift
+
+
+def reconcile_in_worker(user_id_start: int, user_id_end: int, repair: bool) -> list:
+    """Process pool entry point; forked children must not reuse the parent's connections."""
+    connections.close_all()
+    return reconcile_user_range(user_id_start, user_id_end, repair)
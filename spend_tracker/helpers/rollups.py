@@ -0,0 +1,94 @@
+import datetime
+import decimal
+import zoneinfo
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import MonthlyUnitTotal, Transaction
+
+
+def get_month(
+    date_time: datetime.datetime | None = None, tz: str | None = None
+) -> datetime.date:
+    """Returns the first day of the month of `date_time` (now by default)
+    in the time zone `tz`, or in the project time zone when it is not given.
+    """
+    tzinfo = zoneinfo.ZoneInfo(tz) if tz else None
+    return timezone.localdate(date_time, tzinfo).replace(day=1)
+
+
+def merge_rollup_deltas(
+    total: dict,
+    deltas: dict,
+    date_time: datetime.datetime,
+    sign: int = 1,
+    tz: str | None = None,
+) -> None:
+    """Adds balance deltas to `total` keyed by `(unit_id, month)`, negated when `sign` is -1.
+    The month is taken in the owner's time zone `tz`.
+    """
+    month = get_month(date_time, tz)
+    for unit_id, delta in deltas.items():
+        key = (unit_id, month)
+        total[key] = total.get(key, decimal.Decimal(0)) + sign * delta
+
+
+def apply_rollup_deltas(user_id: int, total: dict) -> None:
+    """Increments the monthly totals of a user, creating missing rows first."""
+    total = {key: delta for key, delta in total.items() if delta}
+    if not total:
+        return
+
+    MonthlyUnitTotal.objects.bulk_create(
+        [
+            MonthlyUnitTotal(user_id=user_id, unit_id=unit_id, month=month)
+            for unit_id, month in total
+        ],
+        ignore_conflicts=True,
+    )
+    for unit_id, month in sorted(total):
+        MonthlyUnitTotal.objects.filter(unit_id=unit_id, month=month).update(
+            amount=F("amount") + total[(unit_id, month)]
+        )
+
+
+@immediate_atomic()
+def rebuild_monthly_totals(user) -> int:
+    """Recomputes every monthly total of a user from the ledger, in the user's
+    time zone, and replaces the stored ones. Returns the number of totals.
+    INCOME units grow with outgoing transactions, the other types shrink.
+    """
+    MonthlyUnitTotal.objects.filter(user=user).delete()
+
+    local_month = TruncMonth("date_time", tzinfo=zoneinfo.ZoneInfo(user.timezone))
+    transactions = Transaction.objects.filter(user=user).annotate(month=local_month)
+    total = {}
+    for unit_id, unit_type, date_time, amount in (
+        transactions.values("source_unit", "source_unit__unit_type", "month")
+        .annotate(amount=Sum("source_amount"))
+        .values_list("source_unit", "source_unit__unit_type", "month", "amount")
+    ):
+        key = (unit_id, date_time.date())
+        sign = 1 if unit_type == "INCOME" else -1
+        total[key] = total.get(key, decimal.Decimal(0)) + sign * amount
+    for unit_id, date_time, amount in (
+        transactions.values("destination_unit", "month")
+        .annotate(amount=Sum("destination_amount"))
+        .values_list("destination_unit", "month", "amount")
+    ):
+        key = (unit_id, date_time.date())
+        total[key] = total.get(key, decimal.Decimal(0)) + amount
+
+    MonthlyUnitTotal.objects.bulk_create(
+        [
+            MonthlyUnitTotal(user=user, unit_id=unit_id, month=month, amount=amount)
+            for (unit_id, month), amount in total.items()
+        ],
+        batch_size=500,
+    )
+    bump_units_version_on_commit(user.id)
+    return len(total)
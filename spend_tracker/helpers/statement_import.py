@@ -0,0 +1,199 @@
+import csv
+import datetime
+import decimal
+from typing import Callable, Iterable
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from spend_tracker.helpers.balances import (
+    apply_balance_deltas,
+    get_balance_deltas,
+    merge_balance_deltas,
+)
+from spend_tracker.helpers.currencies import convert_currencies_as_of
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.currency_registry import registry
+from spend_tracker.helpers.rollups import apply_rollup_deltas, merge_rollup_deltas
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import StatementImport, Transaction, Unit
+
+# Maps `Transaction` fields to CSV column names
+DEFAULT_COLUMNS = {
+    "date_time": "date",
+    "source_unit": "source",
+    "destination_unit": "destination",
+    "source_amount": "source_amount",
+    "destination_amount": "destination_amount",
+}
+BATCH_SIZE = 1000
+MAX_ERRORS = 100
+
+
+class StatementAlreadyImported(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This statement was already imported."
+    default_code = "statement_already_imported"
+
+
+def _parse_amount(value: str | None) -> decimal.Decimal | None:
+    if value is None or not value.strip():
+        return None
+    try:
+        return decimal.Decimal(value.strip()).quantize(decimal.Decimal("0.01"))
+    except decimal.InvalidOperation:
+        raise ValidationError(f"Invalid amount '{value}'.")
+
+
+def _parse_date_time(value: str | None) -> datetime.datetime:
+    try:
+        date_time = datetime.datetime.fromisoformat((value or "").strip())
+    except ValueError:
+        raise ValidationError(f"Invalid date '{value}'.")
+    if timezone.is_naive(date_time):
+        date_time = timezone.make_aware(date_time)
+    return date_time
+
+
+def build_transaction(
+    user, row: dict, columns: dict, units: dict
+) -> tuple[Transaction, dict]:
+    """Maps a CSV row to an unsaved transaction and its balance deltas.
+    Missing amounts are converted with the in-memory rates effective at the row's date,
+    so no queries are made.
+    """
+    try:
+        source_unit = units[row.get(columns["source_unit"])]
+        destination_unit = units[row.get(columns["destination_unit"])]
+    except KeyError as error:
+        raise ValidationError(f"Unknown unit {error}.")
+
+    source_amount = _parse_amount(row.get(columns["source_amount"]))
+    destination_amount = _parse_amount(row.get(columns["destination_amount"]))
+    if source_amount is None and destination_amount is None:
+        raise ValidationError("You must specify a destination or source amount")
+
+    date_time = _parse_date_time(row.get(columns["date_time"]))
+    source_currency = registry.get(source_unit.currency_id)
+    destination_currency = registry.get(destination_unit.currency_id)
+    if destination_amount is None:
+        destination_amount = convert_currencies_as_of(
+            source_amount, source_currency, destination_currency, date_time
+        ).quantize(decimal.Decimal("0.01"))
+    elif source_amount is None:
+        source_amount = convert_currencies_as_of(
+            destination_amount, destination_currency, source_currency, date_time
+        ).quantize(decimal.Decimal("0.01"))
+
+    deltas = get_balance_deltas(
+        source_unit=source_unit,
+        destination_unit=destination_unit,
+        source_amount=source_amount,
+        destination_amount=destination_amount,
+    )
+    instance = Transaction(
+        date_time=date_time,
+        source_unit=source_unit,
+        destination_unit=destination_unit,
+        source_amount=source_amount,
+        destination_amount=destination_amount,
+        user=user,
+    )
+    return instance, deltas
+
+
+def import_statement(
+    user,
+    lines: Iterable[str],
+    name: str,
+    columns: dict | None = None,
+    batch_size: int = BATCH_SIZE,
+    progress: Callable[[StatementImport], None] | None = None,
+) -> StatementImport:
+    """Imports a CSV statement as a stream, inserting transactions in bulk batches.
+
+    Every batch is committed with its balance and monthly total increments and
+    a checkpoint, so calling it again with the same `name` resumes after the
+    last committed batch, and the ledger always matches the balances.
+    Raises `StatementAlreadyImported` when the import of `name` has finished,
+    and `ValidationError` when the file is not UTF-8 or not valid CSV, after
+    committing the rows read before that point.
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    checkpoint, _ = StatementImport.objects.get_or_create(user=user, name=name)
+    if checkpoint.status == "DONE":
+        raise StatementAlreadyImported(
+            f"Statement '{name}' was already imported. "
+            "Import a new statement under another name."
+        )
+
+    units = {unit.name: unit for unit in Unit.objects.filter(user=user)}
+    batch, errors = [], []
+    row_number = checkpoint.rows_processed
+
+    try:
+        for row_number, row in enumerate(csv.DictReader(lines), start=1):
+            if row_number <= checkpoint.rows_processed:
+                continue
+            try:
+                batch.append(build_transaction(user, row, columns, units))
+            except ValidationError as error:
+                errors.append({"row": row_number, "error": _error_message(error)})
+
+            if len(batch) >= batch_size:
+                _save_batch(checkpoint, batch, errors, row_number)
+                batch, errors = [], []
+                if progress:
+                    progress(checkpoint)
+    except (UnicodeDecodeError, csv.Error) as error:
+        if row_number > checkpoint.rows_processed:
+            _save_batch(checkpoint, batch, errors, row_number)
+        raise ValidationError(
+            f"The statement could not be read after row {row_number}: {error}. "
+            "Upload it as a UTF-8 encoded CSV file."
+        )
+
+    _save_batch(checkpoint, batch, errors, row_number)
+    _finish(checkpoint)
+    if progress:
+        progress(checkpoint)
+    return checkpoint
+
+
+@immediate_atomic()
+def _save_batch(
+    checkpoint: StatementImport, batch: list, errors: list, row_number: int
+) -> None:
+    Transaction.objects.bulk_create(
+        [instance for instance, _ in batch], batch_size=BATCH_SIZE
+    )
+
+    # Merged first, so every unit and month gets one increment per batch
+    balance_deltas, monthly_deltas = {}, {}
+    for instance, deltas in batch:
+        merge_balance_deltas(balance_deltas, deltas)
+        merge_rollup_deltas(
+            monthly_deltas, deltas, instance.date_time, tz=checkpoint.user.timezone
+        )
+    apply_balance_deltas(balance_deltas)
+    apply_rollup_deltas(checkpoint.user_id, monthly_deltas)
+    if batch:
+        bump_units_version_on_commit(checkpoint.user_id)
+
+    checkpoint.rows_processed = row_number
+    checkpoint.rows_imported += len(batch)
+    checkpoint.errors = (checkpoint.errors + errors)[:MAX_ERRORS]
+    checkpoint.save()
+
+
+def _finish(checkpoint: StatementImport) -> None:
+    checkpoint.status = "DONE"
+    checkpoint.save(update_fields=["status", "updated_at"])
+
+
+def _error_message(error: ValidationError) -> str:
+    detail = error.detail
+    if isinstance(detail, list) and detail:
+        return str(detail[0])
+    return str(detail)
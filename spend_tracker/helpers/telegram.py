@@ -6,6 +6,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+TIMEOUT = (3.05, 10)
+
+_session = requests.Session()
+
+
+class TelegramError(Exception):
+    pass
+
+
 def send_telegram_message(message: str) -> None:
     url = f"https://api.telegram.org/bot{os.getenv('TELEGRAM_BOT_TOKEN')}/sendMessage"
 
@@ -15,7 +26,10 @@ def send_telegram_message(message: str) -> None:
         "parse_mode": "HTML",
     }
 
-    response = requests.post(url, data=payload)
+    try:
+        response = _session.post(url, data=payload, timeout=TIMEOUT)
+    except requests.RequestException as error:
+        raise TelegramError(f"Error sending message: {error}") from error
 
     if response.status_code != 200:
-        raise Exception(f"Error sending message: {response.text}")
+        raise TelegramError(f"Error sending message: {response.text}")
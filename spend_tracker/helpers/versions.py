@@ -0,0 +1,25 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _units_version_key(user_id: int) -> str:
+    return f"spend_tracker:units_version:{user_id}"
+
+
+def get_units_version(user_id: int) -> int:
+    """Returns the version of a user's units and default currency."""
+    return cache.get_or_set(_units_version_key(user_id), 1, timeout=None)
+
+
+def bump_units_version(user_id: int) -> None:
+    """Invalidates everything cached from a user's units or default currency."""
+    try:
+        cache.incr(_units_version_key(user_id))
+    except ValueError:
+        cache.add(_units_version_key(user_id), 2, timeout=None)
+
+
+def bump_units_version_on_commit(user_id: int) -> None:
+    transaction.on_commit(partial(bump_units_version, user_id))
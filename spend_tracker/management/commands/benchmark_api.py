@@ -0,0 +1,446 @@
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from spend_tracker.helpers.benchmarks import percentile
+from spend_tracker.management.commands.generate_benchmark_data import (
+    PASSWORD,
+    get_benchmark_email,
+)
+from spend_tracker.models import Currency, Transaction, Unit
+
+STAFF_EMAIL = "benchmark-staff@example.com"
+ENDPOINTS = (
+    "currency-list",
+    "currency-detail",
+    "unit-list",
+    "unit-detail",
+    "unit-create",
+    "unit-update",
+    "unit-delete",
+    "transaction-list",
+    "transaction-list-filtered",
+    "transaction-detail",
+    "transaction-create",
+    "transaction-update",
+    "transaction-delete",
+    "transaction-batch",
+    "transaction-export",
+    "default-currency-list",
+    "default-currency-create",
+    "monthly-summary",
+    "net-worth",
+    "statement-import-create",
+    "statement-import-list",
+    "async-transaction-list",
+    "async-transaction-detail",
+    "async-unit-list",
+    "async-unit-detail",
+    "async-currency-list",
+    "async-currency-detail",
+    "user-register",
+    "user-token",
+    "user-token-refresh",
+    "user-token-verify",
+    "user-me",
+    "user-me-update",
+)
+
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    data: dict | None = None
+    status: int = 200
+    staff: bool = False
+    multipart: bool = False
+
+
+class Scenario:
+    """Builds one request per endpoint for a benchmark user.
+    Setup a request needs, such as creating the object that a delete removes,
+    runs here, before the request is timed.
+    """
+
+    def __init__(self, user, staff):
+        self.user = user
+        self.headers = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+        self.staff_headers = {"authorization": f"Bearer {AccessToken.for_user(staff)}"}
+        self.refresh_token = str(RefreshToken.for_user(user))
+        self.counter = itertools.count()
+
+        units = {}
+        for unit in Unit.objects.filter(user=user).order_by("id"):
+            units.setdefault(unit.unit_type, unit)
+        if len(units) < 3:
+            raise CommandError(
+                f"'{user.email}' needs INCOME, ACCOUNT and EXPENSE units, "
+                "run generate_benchmark_data first."
+            )
+        self.income, self.account, self.expense = (
+            units["INCOME"],
+            units["ACCOUNT"],
+            units["EXPENSE"],
+        )
+        self.currency = Currency.objects.order_by("id").first()
+        self.transaction = self._find_transaction()
+
+    def call(self, name: str, client: Client) -> Call:
+        return getattr(self, name.replace("-", "_"))(client)
+
+    def _unique(self) -> str:
+        return f"{next(self.counter)}-{uuid.uuid4().hex[:8]}"
+
+    def _transaction_data(self) -> dict:
+        return {
+            "source_unit": self.account.id,
+            "destination_unit": self.expense.id,
+            "source_amount": "12.34",
+        }
+
+    def _find_transaction(self) -> Transaction:
+        transaction = (
+            Transaction.objects.filter(
+                user=self.user, source_unit=self.account, destination_unit=self.expense
+            )
+            .order_by("-id")
+            .first()
+        )
+        if transaction is None:
+            raise CommandError(f"'{self.user.email}' has no transactions.")
+        return transaction
+
+    def _post_transaction(self, client: Client) -> int:
+        response = client.post(
+            "/api/spend-tracker/transaction/",
+            self._transaction_data(),
+            content_type="application/json",
+            headers=self.headers,
+        )
+        return response.json()["id"]
+
+    def currency_list(self, client):
+        return Call("get", "/api/spend-tracker/currency/", staff=True)
+
+    def currency_detail(self, client):
+        return Call(
+            "get", f"/api/spend-tracker/currency/{self.currency.id}/", staff=True
+        )
+
+    def unit_list(self, client):
+        return Call("get", "/api/spend-tracker/unit/")
+
+    def unit_detail(self, client):
+        return Call("get", f"/api/spend-tracker/unit/{self.account.id}/")
+
+    def unit_create(self, client):
+        data = {
+            "name": f"U {self._unique()}"[:20],
+            "unit_type": "ACCOUNT",
+            "currency": self.currency.id,
+        }
+        return Call("post", "/api/spend-tracker/unit/", data, status=201)
+
+    def unit_update(self, client):
+        data = {"in_balance": True}
+        return Call("patch", f"/api/spend-tracker/unit/{self.account.id}/", data)
+
+    def unit_delete(self, client):
+        unit = Unit.objects.create(
+            name=f"D {self._unique()}"[:20],
+            unit_type="ACCOUNT",
+            currency=self.currency,
+            user=self.user,
+        )
+        return Call("delete", f"/api/spend-tracker/unit/{unit.id}/", status=204)
+
+    def transaction_list(self, client):
+        return Call("get", "/api/spend-tracker/transaction/")
+
+    def transaction_list_filtered(self, client):
+        date_from = (datetime.date.today() - datetime.timedelta(days=90)).isoformat()
+        return Call(
+            "get",
+            f"/api/spend-tracker/transaction/?unit={self.expense.id}"
+            f"&date_from={date_from}&amount_min=10",
+        )
+
+    def transaction_detail(self, client):
+        return Call("get", f"/api/spend-tracker/transaction/{self.transaction.id}/")
+
+    def transaction_create(self, client):
+        return Call(
+            "post",
+            "/api/spend-tracker/transaction/",
+            self._transaction_data(),
+            status=201,
+        )
+
+    def transaction_update(self, client):
+        data = {
+            **self._transaction_data(),
+            "source_amount": str(self.transaction.source_amount),
+            "destination_amount": str(self.transaction.destination_amount),
+        }
+        return Call(
+            "put", f"/api/spend-tracker/transaction/{self.transaction.id}/", data
+        )
+
+    def transaction_delete(self, client):
+        transaction_id = self._post_transaction(client)
+        return Call(
+            "delete", f"/api/spend-tracker/transaction/{transaction_id}/", status=204
+        )
+
+    def transaction_batch(self, client):
+        data = [
+            {"action": "create", "data": self._transaction_data()} for _ in range(10)
+        ]
+        return Call("post", "/api/spend-tracker/transaction/batch/", data)
+
+    def transaction_export(self, client):
+        return Call(
+            "get",
+            "/api/spend-tracker/transaction/export/?output=ndjson&amount_min=4000",
+        )
+
+    def default_currency_list(self, client):
+        return Call("get", "/api/spend-tracker/default-currency/")
+
+    def default_currency_create(self, client):
+        data = {"default_currency": self.currency.id}
+        return Call("post", "/api/spend-tracker/default-currency/", data, status=201)
+
+    def monthly_summary(self, client):
+        return Call("get", "/api/spend-tracker/monthly-summary/")
+
+    def net_worth(self, client):
+        return Call("get", "/api/spend-tracker/net-worth/")
+
+    def statement_import_create(self, client):
+        lines = ["date,source,destination,source_amount,destination_amount"]
+        lines += [
+            f"2024-01-{day:02d}T12:00:00,{self.account.name},{self.expense.name},"
+            f"{day}.50,"
+            for day in range(1, 21)
+        ]
+        statement = SimpleUploadedFile(
+            "statement.csv", "\n".join(lines).encode(), content_type="text/csv"
+        )
+        data = {"file": statement, "name": f"benchmark-{self._unique()}"}
+        return Call(
+            "post",
+            "/api/spend-tracker/statement-import/",
+            data,
+            status=201,
+            multipart=True,
+        )
+
+    def statement_import_list(self, client):
+        return Call("get", "/api/spend-tracker/statement-import/")
+
+    def async_transaction_list(self, client):
+        return Call("get", "/api/spend-tracker/async/transaction/")
+
+    def async_transaction_detail(self, client):
+        return Call(
+            "get", f"/api/spend-tracker/async/transaction/{self.transaction.id}/"
+        )
+
+    def async_unit_list(self, client):
+        return Call("get", "/api/spend-tracker/async/unit/")
+
+    def async_unit_detail(self, client):
+        return Call("get", f"/api/spend-tracker/async/unit/{self.account.id}/")
+
+    def async_currency_list(self, client):
+        return Call("get", "/api/spend-tracker/async/currency/", staff=True)
+
+    def async_currency_detail(self, client):
+        return Call(
+            "get",
+            f"/api/spend-tracker/async/currency/{self.currency.id}/",
+            staff=True,
+        )
+
+    def user_register(self, client):
+        data = {"email": f"benchmark-{self._unique()}@example.com", "password": "12345"}
+        return Call("post", "/api/user/register/", data, status=201)
+
+    def user_token(self, client):
+        data = {"email": self.user.email, "password": PASSWORD}
+        return Call("post", "/api/user/token/", data)
+
+    def user_token_refresh(self, client):
+        return Call("post", "/api/user/token/refresh/", {"refresh": self.refresh_token})
+
+    def user_token_verify(self, client):
+        token = self.headers["authorization"].split()[1]
+        return Call("post", "/api/user/token/verify/", {"token": token})
+
+    def user_me(self, client):
+        return Call("get", "/api/user/me/")
+
+    def user_me_update(self, client):
+        return Call("patch", "/api/user/me/", {"timezone": self.user.timezone})
+
+
+def _send(scenario: Scenario, client: Client, name: str) -> tuple[float, int, bool]:
+    """Sends one request and returns its latency, query count and success."""
+    call = scenario.call(name, client)
+    headers = scenario.staff_headers if call.staff else scenario.headers
+    kwargs = {"headers": headers}
+    if call.data is not None and not call.multipart:
+        kwargs["data"] = json.dumps(call.data)
+        kwargs["content_type"] = "application/json"
+    elif call.data is not None:
+        kwargs["data"] = call.data
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, call.method)(call.path, **kwargs)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        latency = time.perf_counter() - started
+    return latency, len(queries), response.status_code == call.status
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends requests to every /api/spend-tracker/ and /api/user/ endpoint "
+        "through the test client and writes latency percentiles, SQL query counts "
+        "and peak memory per endpoint to a JSON file. Writes change the data, so "
+        "run it against a database filled by generate_benchmark_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            default=get_benchmark_email(42, 0),
+            help="Benchmark user, created by generate_benchmark_data.",
+        )
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+        parser.add_argument(
+            "--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS)
+        )
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument(
+            "--compare", help="Earlier results file to compare p95 latency against."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['email']}' does not exist.")
+        staff, _ = get_user_model().objects.get_or_create(
+            email=STAFF_EMAIL, defaults={"is_staff": True}
+        )
+        scenario = Scenario(user, staff)
+
+        results = []
+        tracemalloc.start()
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                for concurrency in options["concurrency"]:
+                    for name in options["endpoints"]:
+                        result = self._run(
+                            scenario, name, options["requests"], concurrency
+                        )
+                        results.append(result)
+                        self._report(result)
+        finally:
+            tracemalloc.stop()
+
+        output = {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "user": user.email,
+            "transactions": Transaction.objects.filter(user=user).count(),
+            "requests": options["requests"],
+            "results": results,
+        }
+        with open(options["output"], "w") as file:
+            json.dump(output, file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options["compare"]:
+            self._compare(results, options["compare"])
+
+    @staticmethod
+    def _run(scenario: Scenario, name: str, requests: int, concurrency: int) -> dict:
+        def send(_):
+            return _send(scenario, Client(), name)
+
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            samples = list(pool.map(send, range(requests)))
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+
+        latencies = [latency * 1000 for latency, _, _ in samples]
+        queries = [count for _, count, _ in samples]
+        return {
+            "endpoint": name,
+            "concurrency": concurrency,
+            "requests": len(samples),
+            "errors": sum(1 for _, _, ok in samples if not ok),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "queries_mean": round(statistics.mean(queries), 1),
+            "queries_max": max(queries),
+            "peak_memory_kb": round(max(0, peak - baseline) / 1024, 1),
+        }
+
+    def _report(self, result: dict) -> None:
+        self.stdout.write(
+            f"{result['endpoint']:<26} c={result['concurrency']:<3} "
+            f"errors={result['errors']:<4} rps={result['rps']:<8} "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"p99={result['p99_ms']}ms queries={result['queries_mean']} "
+            f"peak={result['peak_memory_kb']}KiB"
+        )
+
+    def _compare(self, results: list[dict], path: str) -> None:
+        with open(path) as file:
+            previous = {
+                (result["endpoint"], result["concurrency"]): result
+                for result in json.load(file)["results"]
+            }
+        self.stdout.write(f"p95 latency compared with {path}:")
+        for result in results:
+            before = previous.get((result["endpoint"], result["concurrency"]))
+            if not before or not before["p95_ms"]:
+                continue
+            change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            self.stdout.write(
+                f"{result['endpoint']:<26} c={result['concurrency']:<3} "
+                f"{before['p95_ms']}ms -> {result['p95_ms']}ms ({change:+.1f}%)"
+            )
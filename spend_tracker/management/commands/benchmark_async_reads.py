@@ -0,0 +1,95 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from spend_tracker.helpers.benchmarks import percentile
+
+
+ENDPOINTS = {
+    "transaction": (
+        "/api/spend-tracker/transaction/",
+        "/api/spend-tracker/async/transaction/",
+    ),
+    "unit": ("/api/spend-tracker/unit/", "/api/spend-tracker/async/unit/"),
+    "currency": (
+        "/api/spend-tracker/currency/",
+        "/api/spend-tracker/async/currency/",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares requests per second and latency of the synchronous (WSGI) and "
+        "async (ASGI) read endpoints at high concurrency. Both handlers run in "
+        "this process through Django's test clients, so the numbers compare the "
+        "request stacks rather than application servers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="User whose data is read.")
+        parser.add_argument("--endpoint", choices=ENDPOINTS, default="transaction")
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['email']}' does not exist.")
+
+        headers = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+        sync_path, async_path = ENDPOINTS[options["endpoint"]]
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for label, run in (
+                ("wsgi", self._run_sync),
+                ("asgi", self._run_async),
+            ):
+                path = sync_path if label == "wsgi" else async_path
+                started = time.perf_counter()
+                latencies, errors = run(
+                    path, headers, options["requests"], options["concurrency"]
+                )
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label} {path} requests={len(latencies)} errors={errors} "
+                    f"rps={len(latencies) / elapsed:.1f} "
+                    f"p50={statistics.median(latencies) * 1000:.1f}ms "
+                    f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+                )
+
+    @staticmethod
+    def _run_sync(path, headers, requests, concurrency):
+        def fetch(_):
+            started = time.perf_counter()
+            response = Client().get(path, headers=headers)
+            return time.perf_counter() - started, response.status_code != 200
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(fetch, range(requests)))
+        return [latency for latency, _ in results], sum(err for _, err in results)
+
+    @staticmethod
+    def _run_async(path, headers, requests, concurrency):
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    return time.perf_counter() - started, response.status_code != 200
+
+            return await asyncio.gather(*(fetch() for _ in range(requests)))
+
+        results = asyncio.run(run())
+        return [latency for latency, _ in results], sum(err for _, err in results)
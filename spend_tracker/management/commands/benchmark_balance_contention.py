@@ -0,0 +1,179 @@
+import multiprocessing
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from spend_tracker.helpers.balances import get_expected_balances
+from spend_tracker.models import Currency, Transaction, Unit
+from spend_tracker.views import TransactionViewSet
+
+OPERATIONS = ("create", "update", "delete")
+OPERATION_WEIGHTS = (6, 3, 1)
+
+
+def _write_transactions(
+    user_id: int, pairs: list, transaction_ids: list, writes: int, seed: int
+) -> tuple[int, int]:
+    """Creates, updates and deletes transactions through `TransactionViewSet`.
+    Updates and deletes pick from `transaction_ids`, which every worker shares,
+    so workers race on the same rows. Returns the number of failures and of
+    requests that found their transaction already deleted.
+    """
+    connections.close_all()
+    user = get_user_model().objects.get(id=user_id)
+    list_view = TransactionViewSet.as_view({"post": "create"})
+    detail_view = TransactionViewSet.as_view({"put": "update", "delete": "destroy"})
+    factory = APIRequestFactory()
+    rng = random.Random(seed)
+    failures = missing = 0
+
+    for _ in range(writes):
+        source_unit, destination_unit = rng.choice(pairs)
+        data = {
+            "source_unit": source_unit,
+            "destination_unit": destination_unit,
+            "source_amount": f"{rng.randint(1, 10000) / 100:.2f}",
+        }
+        operation = rng.choices(OPERATIONS, weights=OPERATION_WEIGHTS)[0]
+        if operation == "create":
+            request = factory.post(
+                "/api/spend-tracker/transaction/", data, format="json"
+            )
+            view, kwargs, expected = list_view, {}, status.HTTP_201_CREATED
+        else:
+            pk = rng.choice(transaction_ids)
+            path = f"/api/spend-tracker/transaction/{pk}/"
+            if operation == "update":
+                request = factory.put(path, data, format="json")
+                expected = status.HTTP_200_OK
+            else:
+                request = factory.delete(path)
+                expected = status.HTTP_204_NO_CONTENT
+            view, kwargs = detail_view, {"pk": pk}
+        force_authenticate(request, user=user)
+        try:
+            response = view(request, **kwargs)
+        except OperationalError:
+            failures += 1
+            continue
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            missing += 1
+        elif response.status_code != expected:
+            failures += 1
+    return failures, missing
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates, updates and deletes transactions from several processes at "
+        "once and checks that the final unit balances match the ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+        parser.add_argument(
+            "--writes", type=int, default=200, help="Writes per worker."
+        )
+        parser.add_argument("--units", type=int, default=4, help="Accounts per user.")
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=50,
+            help="Transactions created up front for the workers to update and delete.",
+        )
+
+    def handle(self, *args, **options):
+        currency = Currency.objects.order_by("id").first()
+        if currency is None:
+            currency = Currency.objects.create(name="USD", rate=1)
+
+        for workers in options["workers"]:
+            user = get_user_model().objects.create_user(
+                email=f"benchmark-{uuid.uuid4().hex}@example.com"
+            )
+            try:
+                pairs = self._create_units(user, currency, options["units"])
+                transaction_ids = self._create_transactions(
+                    user, pairs, options["transactions"]
+                )
+                connections.close_all()
+
+                started = time.perf_counter()
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    results = pool.starmap(
+                        _write_transactions,
+                        [
+                            (user.id, pairs, transaction_ids, options["writes"], seed)
+                            for seed in range(workers)
+                        ],
+                    )
+                failures = sum(failed for failed, _ in results)
+                missing = sum(found_deleted for _, found_deleted in results)
+                elapsed = time.perf_counter() - started
+
+                units = Unit.objects.filter(user=user)
+                expected = get_expected_balances(units)
+                drift = sum(1 for unit in units if unit.amount != expected[unit.id])
+                writes = workers * options["writes"] - failures
+                self.stdout.write(
+                    f"workers={workers:<3} writes={writes:<6} failures={failures:<5} "
+                    f"already_deleted={missing:<5} writes/s={writes / elapsed:.1f} "
+                    f"drifted_units={drift}"
+                )
+            finally:
+                user.delete()
+
+    @staticmethod
+    def _create_transactions(user, pairs: list, count: int) -> list[int]:
+        """Creates `count` transactions through the view, so balances include them."""
+        view = TransactionViewSet.as_view({"post": "create"})
+        factory = APIRequestFactory()
+        rng = random.Random(count)
+        for _ in range(count):
+            source_unit, destination_unit = rng.choice(pairs)
+            request = factory.post(
+                "/api/spend-tracker/transaction/",
+                {
+                    "source_unit": source_unit,
+                    "destination_unit": destination_unit,
+                    "source_amount": f"{rng.randint(1, 10000) / 100:.2f}",
+                },
+                format="json",
+            )
+            force_authenticate(request, user=user)
+            view(request)
+        return list(Transaction.objects.filter(user=user).values_list("id", flat=True))
+
+    @staticmethod
+    def _create_units(user, currency, count: int) -> list[tuple[int, int]]:
+        """Creates an income, an expense and `count` accounts, returning valid unit pairs."""
+        income = Unit.objects.create(
+            name="Salary", unit_type="INCOME", currency=currency, user=user
+        )
+        expense = Unit.objects.create(
+            name="Food", unit_type="EXPENSE", currency=currency, user=user
+        )
+        accounts = [
+            Unit.objects.create(
+                name=f"Account {index}",
+                unit_type="ACCOUNT",
+                currency=currency,
+                user=user,
+            )
+            for index in range(count)
+        ]
+        pairs = [(income.id, account.id) for account in accounts]
+        pairs += [(account.id, expense.id) for account in accounts]
+        pairs += [
+            (source.id, destination.id)
+            for source in accounts
+            for destination in accounts
+            if source != destination
+        ]
+        return pairs
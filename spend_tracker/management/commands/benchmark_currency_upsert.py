@@ -0,0 +1,79 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from spend_tracker.helpers.currencies import save_currency_rates
+from spend_tracker.models import Currency
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_loop(rates: dict) -> None:
+    for currency_name, currency_rate in rates.items():
+        Currency.objects.update_or_create(
+            name=currency_name, defaults={"rate": currency_rate}
+        )
+
+
+def _fake_rates(count: int) -> dict:
+    names = set()
+    while len(names) < count:
+        names.add("".join(random.choices(string.ascii_uppercase, k=3)))
+    return {name: round(random.uniform(0.1, 5000), 6) for name in sorted(names)}
+
+
+class Command(BaseCommand):
+    help = "Compares query count and time of the bulk currency upsert against the per-row loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=170)
+        parser.add_argument(
+            "--changed",
+            type=float,
+            default=0.3,
+            help="Share of rates that change between the seed and the measured run.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        initial = _fake_rates(options["count"])
+        changed = dict(initial)
+        for name in random.sample(
+            sorted(changed), int(len(changed) * options["changed"])
+        ):
+            changed[name] = round(changed[name] * 1.01, 6)
+
+        for label, writer in (("loop", _legacy_loop), ("bulk", save_currency_rates)):
+            for phase, rates in (("insert", initial), ("update", changed)):
+                queries, elapsed = self._measure(writer, initial, rates, phase)
+                self.stdout.write(
+                    f"{label:<5} {phase:<7} queries={queries:<5} time={elapsed * 1000:.1f}ms"
+                )
+
+    @staticmethod
+    def _measure(writer, initial: dict, rates: dict, phase: str) -> tuple[int, float]:
+        """Runs `writer` inside a rolled back transaction so the database is left untouched."""
+        result = (0, 0.0)
+        try:
+            with transaction.atomic():
+                Currency.objects.filter(name__in=initial).delete()
+                if phase == "update":
+                    save_currency_rates(initial)
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    writer(rates)
+                    result = (
+                        len(context.captured_queries),
+                        time.perf_counter() - started,
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        return result
@@ -0,0 +1,114 @@
+import datetime
+import decimal
+import io
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from spend_tracker.management.commands.generate_benchmark_data import CURRENCY_RATES
+from spend_tracker.models import Currency, Transaction, Unit
+from spend_tracker.serializers import TransactionListSerializer
+from spendlog.parsers import ORJSONParser
+from spendlog.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+def _build_transactions(rng, rows: int) -> list[Transaction]:
+    """Builds unsaved transactions, so the benchmark needs no data in the database."""
+    user = get_user_model()(id=1, email="benchmark@example.com")
+    currencies = [
+        Currency(id=index, name=name, rate=rate)
+        for index, (name, rate) in enumerate(CURRENCY_RATES.items(), start=1)
+    ]
+    units = [
+        Unit(
+            id=index,
+            name=f"{unit_type.title()} {index}",
+            unit_type=unit_type,
+            currency=rng.choice(currencies),
+            user=user,
+        )
+        for index, unit_type in enumerate(
+            ["INCOME", "EXPENSE", "EXPENSE"] + ["ACCOUNT"] * 9, start=1
+        )
+    ]
+    end = timezone.now()
+    return [
+        Transaction(
+            id=index,
+            date_time=end - datetime.timedelta(seconds=rng.randrange(730 * 86400)),
+            source_unit=rng.choice(units),
+            destination_unit=rng.choice(units),
+            source_amount=decimal.Decimal(rng.randint(100, 500_000)) / 100,
+            destination_amount=decimal.Decimal(rng.randint(100, 500_000)) / 100,
+            user=user,
+        )
+        for index in range(1, rows + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares encoding `TransactionListSerializer` output with REST framework's "
+        "JSON renderer, the orjson renderer and the MessagePack renderer, and "
+        "decoding it with both JSON parsers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        transactions = _build_transactions(
+            random.Random(options["seed"]), options["rows"]
+        )
+        started = time.perf_counter()
+        data = TransactionListSerializer(transactions, many=True).data
+        self.stdout.write(
+            f"serializer rows={options['rows']} "
+            f"time={(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+        renderers = [
+            ("json", JSONRenderer()),
+            ("orjson", ORJSONRenderer()),
+            ("msgpack", MessagePackRenderer()),
+        ]
+
+        expected = JSONRenderer().render(data)
+        for label, renderer in renderers:
+            body = renderer.render(data)
+            timings = self._measure(lambda: renderer.render(data), options["repeat"])
+            same = body == expected if renderer.format == "json" else "-"
+            self.stdout.write(
+                f"render {label:<8} {self._format(timings)} "
+                f"bytes={len(body):<9} same_as_json={same}"
+            )
+
+        for label, parser in (("json", JSONParser()), ("orjson", ORJSONParser())):
+            timings = self._measure(
+                lambda: parser.parse(io.BytesIO(expected)), options["repeat"]
+            )
+            self.stdout.write(f"parse  {label:<8} {self._format(timings)}")
+
+    @staticmethod
+    def _measure(function, repeat: int) -> list[float]:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    @staticmethod
+    def _format(timings: list[float]) -> str:
+        return (
+            f"p50={statistics.median(timings) * 1000:.1f}ms "
+            f"min={min(timings) * 1000:.1f}ms"
+        )
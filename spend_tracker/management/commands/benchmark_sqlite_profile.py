@@ -0,0 +1,170 @@
+import multiprocessing
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from spend_tracker.management.commands.benchmark_balance_contention import (
+    Command as ContentionCommand,
+)
+from spend_tracker.models import Currency
+from spend_tracker.views import TransactionViewSet, UnitViewSet
+
+# Plain sqlite3 defaults, as used before the tuned profile
+BASELINE_PROFILE = {
+    "CONN_MAX_AGE": 0,
+    "CONN_HEALTH_CHECKS": False,
+    "OPTIONS": {"init_command": "PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL"},
+}
+
+
+def _get_profiles() -> dict:
+    tuned = settings.DATABASES["default"]
+    return {
+        "baseline": BASELINE_PROFILE,
+        "tuned": {
+            "CONN_MAX_AGE": tuned.get("CONN_MAX_AGE", 0),
+            "CONN_HEALTH_CHECKS": tuned.get("CONN_HEALTH_CHECKS", False),
+            "OPTIONS": tuned.get("OPTIONS", {}),
+        },
+    }
+
+
+def _run_worker(
+    user_id: int, pairs: list, operations: int, write_ratio: float, seed: int
+) -> tuple[int, int, int]:
+    """Mixes transaction writes with unit and transaction reads.
+    Connections are released after every operation as at the end of a request,
+    so `CONN_MAX_AGE` applies. Returns the number of reads, writes and failures.
+    """
+    connections.close_all()
+    user = get_user_model().objects.get(id=user_id)
+    factory = APIRequestFactory()
+    create = TransactionViewSet.as_view({"post": "create"})
+    list_transactions = TransactionViewSet.as_view({"get": "list"})
+    list_units = UnitViewSet.as_view({"get": "list"})
+    rng = random.Random(seed)
+    reads = writes = failures = 0
+
+    for _ in range(operations):
+        if rng.random() < write_ratio:
+            source_unit, destination_unit = rng.choice(pairs)
+            request = factory.post(
+                "/api/spend-tracker/transaction/",
+                {
+                    "source_unit": source_unit,
+                    "destination_unit": destination_unit,
+                    "source_amount": f"{rng.randint(1, 10000) / 100:.2f}",
+                },
+                format="json",
+            )
+            view, expected_status = create, 201
+        elif rng.random() < 0.5:
+            request = factory.get("/api/spend-tracker/transaction/")
+            view, expected_status = list_transactions, 200
+        else:
+            request = factory.get("/api/spend-tracker/unit/")
+            view, expected_status = list_units, 200
+
+        force_authenticate(request, user=user)
+        try:
+            response = view(request)
+            ok = response.status_code == expected_status
+        except OperationalError:
+            ok = False
+        finally:
+            close_old_connections()
+
+        if not ok:
+            failures += 1
+        elif request.method == "POST":
+            writes += 1
+        else:
+            reads += 1
+    return reads, writes, failures
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a mixed read/write workload from several processes with the "
+        "baseline and the tuned SQLite profiles and reports their throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+        parser.add_argument(
+            "--operations", type=int, default=300, help="Operations per worker."
+        )
+        parser.add_argument(
+            "--write-ratio", type=float, default=0.2, help="Share of writes."
+        )
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=["baseline", "tuned"],
+            choices=["baseline", "tuned"],
+        )
+
+    def handle(self, *args, **options):
+        if connections["default"].vendor != "sqlite":
+            self.stderr.write("The default database is not SQLite.")
+            return
+
+        currency = Currency.objects.order_by("id").first()
+        if currency is None:
+            currency = Currency.objects.create(name="USD", rate=1)
+
+        profiles = _get_profiles()
+        for name in options["profiles"]:
+            for workers in options["workers"]:
+                self._run(name, profiles[name], workers, currency, options)
+
+    def _run(self, name: str, profile: dict, workers: int, currency, options) -> None:
+        connection = connections["default"]
+        original = {key: connection.settings_dict.get(key) for key in profile}
+        connections.close_all()
+        connection.settings_dict.update(profile)
+
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex}@example.com"
+        )
+        try:
+            pairs = ContentionCommand._create_units(user, currency, 4)
+            connections.close_all()
+
+            started = time.perf_counter()
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    results = pool.starmap(
+                        _run_worker,
+                        [
+                            (
+                                user.id,
+                                pairs,
+                                options["operations"],
+                                options["write_ratio"],
+                                seed,
+                            )
+                            for seed in range(workers)
+                        ],
+                    )
+            elapsed = time.perf_counter() - started
+
+            reads, writes, failures = (sum(column) for column in zip(*results))
+            self.stdout.write(
+                f"profile={name:<8} workers={workers:<3} reads={reads:<6} "
+                f"writes={writes:<6} failures={failures:<5} "
+                f"ops/s={(reads + writes) / elapsed:.1f}"
+            )
+        finally:
+            user.delete()
+            connections.close_all()
+            connection.settings_dict.update(original)
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from spend_tracker.helpers.export import (
+    EXPORT_FORMATS,
+    export_transactions,
+    filter_date_range,
+)
+from spend_tracker.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Streams a user's transactions as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to export.")
+        parser.add_argument("--output", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--date-from", help="First day to include, YYYY-MM-DD.")
+        parser.add_argument("--date-to", help="Last day to include, YYYY-MM-DD.")
+        parser.add_argument("--file", help="Write to this path instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['email']}' does not exist.")
+
+        try:
+            queryset = filter_date_range(
+                Transaction.objects.filter(user=user).order_by("date_time", "id"),
+                options["date_from"],
+                options["date_to"],
+            )
+        except ValidationError as error:
+            raise CommandError(error.detail[0])
+
+        lines = export_transactions(queryset, options["output"])
+        if options["file"]:
+            with open(options["file"], "w", newline="") as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,177 @@
+import datetime
+import decimal
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from spend_tracker.helpers.balances import (
+    AMOUNT_QUANTUM,
+    apply_balance_deltas,
+    get_balance_deltas,
+    merge_balance_deltas,
+)
+from spend_tracker.helpers.currencies import save_currency_rates
+from spend_tracker.helpers.rollups import apply_rollup_deltas, merge_rollup_deltas
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import Currency, DefaultCurrency, Transaction, Unit
+
+
+CURRENCY_RATES = {
+    "USD": 1,
+    "EUR": 0.92,
+    "GBP": 0.79,
+    "UAH": 41.2,
+    "PLN": 3.98,
+    "JPY": 151.3,
+    "CHF": 0.88,
+    "CAD": 1.37,
+}
+TIMEZONES = ("America/New_York", "Europe/Kyiv", "Europe/London", "Asia/Tokyo")
+PASSWORD = "benchmark"
+
+
+def get_benchmark_email(seed: int, index: int) -> str:
+    return f"benchmark-{seed}-{index}@example.com"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a reproducible data set for benchmarks: users in several time "
+        "zones, units across currencies and transactions spread over the past "
+        f"years. Users get the password '{PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--units", type=int, default=12, help="Units per user.")
+        parser.add_argument(
+            "--transactions", type=int, default=1_000_000, help="Total transactions."
+        )
+        parser.add_argument("--days", type=int, default=730, help="Days of history.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        save_currency_rates(CURRENCY_RATES)
+        currencies = list(Currency.objects.filter(name__in=CURRENCY_RATES))
+        end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end - datetime.timedelta(days=options["days"])
+
+        started = time.perf_counter()
+        users = self._create_users(rng, options["seed"], options["users"], currencies)
+        per_user, extra = divmod(options["transactions"], max(1, len(users)))
+        for index, user in enumerate(users):
+            units = self._create_units(rng, user, options["units"], currencies)
+            count = per_user + (1 if index < extra else 0)
+            self._create_transactions(
+                rng, user, units, count, start, end, options["batch_size"]
+            )
+            self.stdout.write(f"{user.email}: {len(units)} units, {count} transactions")
+
+        self.stdout.write(
+            f"Generated {len(users)} users and {options['transactions']} "
+            f"transactions in {time.perf_counter() - started:.1f}s"
+        )
+
+    @staticmethod
+    def _create_users(rng, seed: int, count: int, currencies: list) -> list:
+        model = get_user_model()
+        password = make_password(PASSWORD)
+        emails = [get_benchmark_email(seed, index) for index in range(count)]
+        model.objects.bulk_create(
+            [
+                model(email=email, password=password, timezone=rng.choice(TIMEZONES))
+                for email in emails
+            ],
+            ignore_conflicts=True,
+        )
+        users = list(model.objects.filter(email__in=emails).order_by("id"))
+        DefaultCurrency.objects.bulk_create(
+            [
+                DefaultCurrency(user=user, default_currency=rng.choice(currencies))
+                for user in users
+            ],
+            ignore_conflicts=True,
+        )
+        return users
+
+    @staticmethod
+    def _create_units(rng, user, count: int, currencies: list) -> list[Unit]:
+        """Creates two incomes, two expenses and accounts for the rest of `count`."""
+        unit_types = ["INCOME", "INCOME", "EXPENSE", "EXPENSE"]
+        unit_types += ["ACCOUNT"] * max(1, count - len(unit_types))
+        Unit.objects.bulk_create(
+            [
+                Unit(
+                    name=f"{unit_type.title()} {index}",
+                    unit_type=unit_type,
+                    currency=rng.choice(currencies),
+                    user=user,
+                )
+                for index, unit_type in enumerate(unit_types)
+            ],
+            ignore_conflicts=True,
+        )
+        return list(
+            Unit.objects.filter(user=user).select_related("currency").order_by("id")
+        )
+
+    @staticmethod
+    def _create_transactions(
+        rng, user, units: list[Unit], count: int, start, end, batch_size: int
+    ) -> None:
+        """Bulk-inserts valid transactions and applies their balances and rollups."""
+        incomes = [unit for unit in units if unit.unit_type == "INCOME"]
+        expenses = [unit for unit in units if unit.unit_type == "EXPENSE"]
+        accounts = [unit for unit in units if unit.unit_type == "ACCOUNT"]
+        span = int((end - start).total_seconds())
+
+        balance_deltas, monthly_deltas, batch = {}, {}, []
+        with transaction.atomic():
+            for _ in range(count):
+                kind = rng.random()
+                if kind < 0.2:
+                    pair = rng.choice(incomes), rng.choice(accounts)
+                elif kind < 0.9 or len(accounts) < 2:
+                    pair = rng.choice(accounts), rng.choice(expenses)
+                else:
+                    pair = rng.sample(accounts, 2)
+                source_unit, destination_unit = pair
+
+                source_amount = decimal.Decimal(rng.randint(100, 500_000)) / 100
+                destination_amount = (
+                    source_amount
+                    * destination_unit.currency.rate
+                    / source_unit.currency.rate
+                ).quantize(AMOUNT_QUANTUM)
+                date_time = start + datetime.timedelta(seconds=rng.randrange(span))
+
+                deltas = get_balance_deltas(
+                    source_unit, destination_unit, source_amount, destination_amount
+                )
+                merge_balance_deltas(balance_deltas, deltas)
+                merge_rollup_deltas(monthly_deltas, deltas, date_time, tz=user.timezone)
+                batch.append(
+                    Transaction(
+                        date_time=date_time,
+                        source_unit=source_unit,
+                        destination_unit=destination_unit,
+                        source_amount=source_amount,
+                        destination_amount=destination_amount,
+                        user=user,
+                    )
+                )
+                if len(batch) >= batch_size:
+                    Transaction.objects.bulk_create(batch)
+                    batch = []
+
+            Transaction.objects.bulk_create(batch)
+            apply_balance_deltas(balance_deltas)
+            apply_rollup_deltas(user.id, monthly_deltas)
+            bump_units_version_on_commit(user.id)
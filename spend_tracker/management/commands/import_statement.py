@@ -0,0 +1,71 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from spend_tracker.helpers.statement_import import (
+    BATCH_SIZE,
+    StatementAlreadyImported,
+    import_statement,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a CSV bank statement for a user. "
+        "Running it again with the same name resumes an interrupted import, "
+        "and fails when that import has finished."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user that owns the units.")
+        parser.add_argument("path", help="Path of the CSV statement.")
+        parser.add_argument("--name", help="Checkpoint name, the file name by default.")
+        parser.add_argument(
+            "--columns",
+            help='JSON mapping of transaction fields to CSV columns, e.g. {"date_time": "Date"}.',
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['email']}' does not exist.")
+
+        try:
+            columns = json.loads(options["columns"]) if options["columns"] else None
+        except json.JSONDecodeError as error:
+            raise CommandError(f"Invalid --columns: {error}")
+
+        with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+            try:
+                checkpoint = import_statement(
+                    user=user,
+                    lines=lines,
+                    name=options["name"] or os.path.basename(options["path"]),
+                    columns=columns,
+                    batch_size=options["batch_size"],
+                    progress=self._report,
+                )
+            except StatementAlreadyImported as error:
+                raise CommandError(f"{error.detail} Pass --name to set it.")
+            except ValidationError as error:
+                raise CommandError(error.detail[0])
+
+        for error in checkpoint.errors:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{checkpoint.name}: {checkpoint.rows_imported} imported, "
+                f"{checkpoint.rows_processed} processed, status {checkpoint.status}"
+            )
+        )
+
+    def _report(self, checkpoint) -> None:
+        self.stdout.write(
+            f"{checkpoint.rows_processed} rows processed, "
+            f"{checkpoint.rows_imported} imported"
+        )
@@ -0,0 +1,36 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from spend_tracker.helpers.rollups import rebuild_monthly_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the monthly unit totals from transactions. Run it once after "
+        "deploying the monthly totals, so months before it are filled in, and "
+        "whenever totals look wrong."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "emails", nargs="*", help="Users to rebuild, every user by default."
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id")
+        if options["emails"]:
+            users = users.filter(email__in=options["emails"])
+
+        started = time.perf_counter()
+        user_count = total_count = 0
+        for user in users.iterator():
+            total_count += rebuild_monthly_totals(user)
+            user_count += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {total_count} monthly totals of {user_count} users "
+                f"({time.perf_counter() - started:.2f}s)"
+            )
+        )
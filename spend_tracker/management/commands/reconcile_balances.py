@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from spend_tracker.helpers.reconciliation import (
+    get_user_id_ranges,
+    reconcile_in_worker,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes unit balances from transactions and reports or repairs drift. "
+        "Units without transactions are skipped, so opening balances set on them "
+        "are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=None,
+            help="Number of user id ranges, four per worker by default.",
+        )
+        parser.add_argument(
+            "--repair", action="store_true", help="Correct drifted balances."
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        ranges = get_user_id_ranges(options["shards"] or workers * 4)
+        connections.close_all()
+
+        started = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            results = pool.starmap(
+                reconcile_in_worker,
+                [(start, end, options["repair"]) for start, end in ranges],
+            )
+        elapsed = time.perf_counter() - started
+
+        drift = [item for result in results for item in result]
+        for item in drift:
+            self.stdout.write(
+                f"Unit {item['unit']}: recorded {item['amount']}, "
+                f"expected {item['expected']}"
+            )
+        action = "repaired" if options["repair"] else "found"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(drift)} drifted units {action} in {len(ranges)} shards "
+                f"({elapsed:.2f}s)"
+            )
+        )
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 from spendlog import settings
 
@@ -11,6 +12,26 @@ class Currency(models.Model):
         return self.name
 
 
+class CurrencyRate(models.Model):
+    currency = models.ForeignKey(
+        Currency, on_delete=models.CASCADE, related_name="history"
+    )
+    rate = models.DecimalField(max_digits=22, decimal_places=6)
+    effective_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["currency", "effective_at"], name="currency_rate_as_of_idx"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.currency.name} | {self.effective_at:%Y-%m-%d %H:%M} | {self.rate}"
+        )
+
+
 class DefaultCurrency(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     default_currency = models.ForeignKey(Currency, on_delete=models.CASCADE)
@@ -41,13 +62,20 @@ class Unit(models.Model):
                 fields=["name", "user"], name="unique_unit_name_per_user"
             )
         ]
+        indexes = [
+            models.Index(fields=["user", "unit_type"], name="unit_user_type_idx"),
+            # Unit lists are ordered by `unit_type`, so it is served by the index too
+            models.Index(
+                fields=["user", "currency", "unit_type"], name="unit_user_currency_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.unit_type} | {self.name} | {self.currency.name}"
 
 
 class Transaction(models.Model):
-    date_time = models.DateTimeField(auto_now_add=True)
+    date_time = models.DateTimeField(default=timezone.now)
     source_unit = models.ForeignKey(
         Unit, on_delete=models.CASCADE, related_name="source_transactions"
     )
@@ -62,9 +90,103 @@ class Transaction(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="transactions"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "date_time", "id"], name="transaction_user_date_idx"
+            ),
+            models.Index(
+                fields=["source_unit", "date_time", "id"],
+                name="transaction_source_date_idx",
+            ),
+            models.Index(
+                fields=["destination_unit", "date_time", "id"],
+                name="transaction_dest_date_idx",
+            ),
+            models.Index(
+                fields=["user", "source_amount"], name="transaction_user_amount_idx"
+            ),
+        ]
+
     def __str__(self):
         return (
             f"{self.user.email} | "
             f"{self.source_amount} {self.source_unit.currency.name} | "
             f"{self.source_unit.name} -> {self.destination_unit.name}"
         )
+
+
+class MonthlyUnitTotal(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_totals",
+    )
+    unit = models.ForeignKey(
+        Unit, on_delete=models.CASCADE, related_name="monthly_totals"
+    )
+    month = models.DateField()
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["unit", "month"], name="unique_unit_month_total"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "month"], name="monthly_total_user_month_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.unit.name} | {self.month:%Y-%m} | {self.amount}"
+
+
+class StatementImport(models.Model):
+    STATUS_CHOICES = [
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="statement_imports",
+    )
+    name = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="RUNNING")
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_statement_import_per_user"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} | {self.name} | {self.status}"
+
+
+class Notification(models.Model):
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sent_at__isnull=True),
+                name="notification_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M:%S} | {self.message[:50]}"
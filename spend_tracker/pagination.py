@@ -0,0 +1,134 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+PREVIOUS = "previous"
+
+
+def encode_cursor(instance, previous: bool = False) -> str:
+    """Encodes the `(date_time, id)` position of `instance` as an opaque cursor.
+    Cursors for the previous page carry a third `previous` part.
+    """
+    parts = [instance.date_time.isoformat(), str(instance.id)]
+    if previous:
+        parts.append(PREVIOUS)
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Returns the `(date_time, id, previous)` position encoded in `cursor`."""
+    try:
+        date_time, pk, *rest = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        date_time, pk = parse_datetime(date_time), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise NotFound("Invalid cursor")
+    if date_time is None or rest not in ([], [PREVIOUS]):
+        raise NotFound("Invalid cursor")
+    return date_time, pk, bool(rest)
+
+
+class TransactionCursorPagination(BasePagination):
+    """Keyset pagination on `(date_time, id)`.
+    Every page is a range scan that starts after the cursor's row, however
+    deep it is and however many transactions share a `date_time`.
+    Pass `?paginate=false` to get the whole unpaginated list.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_page_query(self, queryset, request):
+        """Returns the query for the requested page plus one row to detect more.
+        Evaluate it and pass the rows to `get_page`.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        self.previous = False
+
+        # The `date_time` bound lets the database seek straight to the cursor
+        if not self.cursor:
+            queryset = queryset.order_by("date_time", "id")
+        else:
+            date_time, pk, self.previous = decode_cursor(self.cursor)
+            if self.previous:
+                queryset = queryset.filter(
+                    Q(date_time__lt=date_time) | Q(id__lt=pk),
+                    date_time__lte=date_time,
+                ).order_by("-date_time", "-id")
+            else:
+                queryset = queryset.filter(
+                    Q(date_time__gt=date_time) | Q(id__gt=pk),
+                    date_time__gte=date_time,
+                ).order_by("date_time", "id")
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows) -> list:
+        """Trims the extra row off the evaluated page query and sets the cursors."""
+        rows = list(rows)
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.previous:
+            rows.reverse()
+
+        # A page reached through a cursor has rows on the side it came from
+        has_next = True if self.previous else has_more
+        has_previous = has_more if self.previous else bool(self.cursor)
+
+        self.next_cursor = self.previous_cursor = None
+        if rows and has_next:
+            self.next_cursor = encode_cursor(rows[-1])
+        if rows and has_previous:
+            self.previous_cursor = encode_cursor(rows[0], previous=True)
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get("paginate", "").lower() in ("false", "0"):
+            return None
+        return self.get_page(self.get_page_query(queryset, request))
+
+    def get_link(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_link(self.next_cursor),
+            "previous": self.get_link(self.previous_cursor),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
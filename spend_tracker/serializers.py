@@ -1,17 +1,95 @@
-from django.db import models
 from rest_framework import serializers
 
 from spend_tracker.helpers.currencies import convert_currencies
-from spend_tracker.models import Currency, Unit, Transaction, DefaultCurrency
+from spend_tracker.helpers.currency_registry import registry
+from spend_tracker.helpers.identity_map import get_identity_map
+from spend_tracker.models import (
+    Currency,
+    Unit,
+    Transaction,
+    DefaultCurrency,
+    MonthlyUnitTotal,
+    StatementImport,
+)
+from spendlog.instrumentation import TimedSerializerMixin
+
+
+class RegistryCurrencyField(serializers.PrimaryKeyRelatedField):
+    """Validates currency ids against the process-local registry instead of the database."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Currency.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        currency = registry.get(data)
+        if currency is None:
+            self.fail("does_not_exist", pk_value=data)
+        return currency
 
+    # Reorder currency choices so the default currency appears first
+    def get_choices(self, cutoff=None):
+        currencies = registry.all()
+        identity_map = get_identity_map(self.context.get("request"))
+        if identity_map and identity_map.default_currency:
+            default_currency = identity_map.default_currency
+            currencies.sort(key=lambda currency: currency != default_currency)
+        if cutoff is not None:
+            currencies = currencies[:cutoff]
+        return {
+            self.to_representation(currency): self.display_value(currency)
+            for currency in currencies
+        }
+
+
+class UserUnitField(serializers.PrimaryKeyRelatedField):
+    """Accepts only units of the request user, resolved from the request-scoped identity map."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Unit.objects.all())
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        identity_map = get_identity_map(self.context.get("request"))
+        if identity_map is None:
+            return super().get_queryset()
+        return Unit.objects.filter(user=identity_map.user).order_by("unit_type")
+
+    def to_internal_value(self, data):
+        identity_map = get_identity_map(self.context.get("request"))
+        if identity_map is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        unit = identity_map.get_unit(data)
+        if unit is None:
+            self.fail("does_not_exist", pk_value=data)
+        return unit
 
-class CurrencySerializer(serializers.ModelSerializer):
+    # Shows only units which belong to user
+    def get_choices(self, cutoff=None):
+        identity_map = get_identity_map(self.context.get("request"))
+        if identity_map is None:
+            return super().get_choices(cutoff)
+        units = list(identity_map.units.values())
+        if cutoff is not None:
+            units = units[:cutoff]
+        return {
+            self.to_representation(unit): self.display_value(unit) for unit in units
+        }
+
+
+class CurrencySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Currency
         fields = ("id", "name", "rate")
 
 
-class DefaultCurrencySerializer(serializers.ModelSerializer):
+class DefaultCurrencySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    default_currency = RegistryCurrencyField()
+
     class Meta:
         model = DefaultCurrency
         fields = ("id", "default_currency", "user")
@@ -23,32 +101,26 @@ class DefaultCurrencyListSerializer(DefaultCurrencySerializer):
     user = serializers.StringRelatedField()
 
 
-class UnitSerializer(serializers.ModelSerializer):
-    currency = serializers.PrimaryKeyRelatedField(
-        queryset=Currency.objects.all(),  # This will be overridden in `__init__`
-        required=False,
+class UnitSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    currency = RegistryCurrencyField(required=False)
+    month_amount = serializers.DecimalField(
+        max_digits=16, decimal_places=2, read_only=True, default=0
     )
 
     class Meta:
         model = Unit
-        fields = ("id", "name", "amount", "unit_type", "currency", "in_balance", "user")
-        read_only_fields = ("user",)
-
-    # Reorder currency choices so the default currency appears first
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        user = self.context["request"].user
-        default_currency = DefaultCurrency.objects.filter(user=user).first()
-
-        if default_currency:
-            self.fields["currency"].queryset = Currency.objects.order_by(
-                models.Case(
-                    models.When(id=default_currency.default_currency.id, then=0),
-                    default=1,
-                    output_field=models.IntegerField(),
-                )
-            )
+        fields = (
+            "id",
+            "name",
+            "amount",
+            "month_amount",
+            "unit_type",
+            "currency",
+            "in_balance",
+            "user",
+        )
+        # Balances come from transactions only, so they always match the ledger
+        read_only_fields = ("amount", "user")
 
 
 class UnitListSerializer(UnitSerializer):
@@ -56,7 +128,10 @@ class UnitListSerializer(UnitSerializer):
     user = serializers.StringRelatedField()
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    source_unit = UserUnitField()
+    destination_unit = UserUnitField()
+
     class Meta:
         model = Transaction
         fields = (
@@ -68,24 +143,15 @@ class TransactionSerializer(serializers.ModelSerializer):
             "destination_amount",
             "user",
         )
-        read_only_fields = ("user",)
-
-    # Shows only units which belong to user
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            user_units = Unit.objects.filter(user=request.user).order_by("unit_type")
-            self.fields["source_unit"].queryset = user_units
-            self.fields["destination_unit"].queryset = user_units
+        read_only_fields = ("date_time", "user")
 
     def validate(self, data):
         """Validates and processes transaction data by ensuring either the source or
         destination amount is provided and calculates the missing value if necessary."""
         source_amount = data.get("source_amount")
-        source_currency = data.get("source_unit").currency
+        source_currency = registry.get(data.get("source_unit").currency_id)
         destination_amount = data.get("destination_amount")
-        destination_currency = data.get("destination_unit").currency
+        destination_currency = registry.get(data.get("destination_unit").currency_id)
 
         if data.get("destination_amount") is None and data.get("source_amount") is None:
             raise serializers.ValidationError(
@@ -112,3 +178,71 @@ class TransactionListSerializer(TransactionSerializer):
     user = serializers.StringRelatedField()
     source_unit = serializers.StringRelatedField()
     destination_unit = serializers.StringRelatedField()
+
+
+class MonthlyUnitTotalSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    month = serializers.DateField(format="%Y-%m")
+    unit_name = serializers.CharField(source="unit.name")
+    unit_type = serializers.CharField(source="unit.unit_type")
+
+    class Meta:
+        model = MonthlyUnitTotal
+        fields = ("month", "unit", "unit_name", "unit_type", "amount")
+
+
+class NetWorthSerializer(TimedSerializerMixin, serializers.Serializer):
+    currency = serializers.CharField(allow_null=True)
+    income = serializers.DecimalField(max_digits=22, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=22, decimal_places=2)
+    account = serializers.DecimalField(max_digits=22, decimal_places=2)
+    net_worth = serializers.DecimalField(max_digits=22, decimal_places=2)
+
+
+class StatementImportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = StatementImport
+        fields = (
+            "id",
+            "name",
+            "status",
+            "rows_processed",
+            "rows_imported",
+            "errors",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
+class StatementUploadSerializer(TimedSerializerMixin, serializers.Serializer):
+    file = serializers.FileField()
+    name = serializers.CharField(max_length=255, required=False)
+    columns = serializers.JSONField(required=False)
+
+    def validate_columns(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Expected a field to column mapping.")
+        return value
+
+
+class TransactionBatchOperationSerializer(TimedSerializerMixin, serializers.Serializer):
+    ACTION_CHOICES = ("create", "update", "delete")
+
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if attrs["action"] == "create" and attrs.get("id") is not None:
+            raise serializers.ValidationError(
+                "`id` is not allowed for the create action"
+            )
+        if attrs["action"] != "create" and attrs.get("id") is None:
+            raise serializers.ValidationError(
+                f"`id` is required for the {attrs['action']} action"
+            )
+        if attrs["action"] != "delete" and attrs.get("data") is None:
+            raise serializers.ValidationError(
+                f"`data` is required for the {attrs['action']} action"
+            )
+        return attrs
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from spend_tracker.helpers.currency_registry import bump_rates_version
+from spend_tracker.helpers.versions import bump_units_version_on_commit
+from spend_tracker.models import Currency, DefaultCurrency, Unit
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_currency_registry(sender, **kwargs):
+    transaction.on_commit(bump_rates_version)
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(post_save, sender=DefaultCurrency)
+@receiver(post_delete, sender=DefaultCurrency)
+def invalidate_user_units(sender, instance, **kwargs):
+    bump_units_version_on_commit(instance.user_id)
@@ -1,15 +1,44 @@
 from spend_tracker.helpers.currencies import update_or_create_currencies_in_db
 
-from celery import shared_task
+from celery import group, shared_task
 
-from spend_tracker.helpers.monthly_reset import reset_income_expense_to_zero
+from spend_tracker.helpers.notifications import drain_outbox
+from spend_tracker.helpers.telegram import TelegramError
+from spend_tracker.helpers.reconciliation import (
+    get_user_id_ranges,
+    reconcile_user_range,
+)
+from spendlog.profiling import profile_task
 
 
 @shared_task
-def update_create_currencies() -> None:
-    update_or_create_currencies_in_db()
+@profile_task
+def update_create_currencies() -> dict | None:
+    return update_or_create_currencies_in_db()
 
 
 @shared_task
-def reset_units_to_zero() -> None:
-    reset_income_expense_to_zero()
+def reconcile_balances_range(
+    user_id_start: int, user_id_end: int, repair: bool = False
+) -> int:
+    return len(reconcile_user_range(user_id_start, user_id_end, repair))
+
+
+@shared_task
+def reconcile_balances(shards: int = 16, repair: bool = False) -> int:
+    ranges = get_user_id_ranges(shards)
+    group(
+        reconcile_balances_range.s(start, end, repair) for start, end in ranges
+    ).apply_async()
+    return len(ranges)
+
+
+@shared_task(
+    autoretry_for=(TelegramError,),
+    retry_backoff=30,
+    retry_backoff_max=30 * 60,
+    retry_jitter=True,
+    max_retries=10,
+)
+def send_notifications() -> int:
+    return drain_outbox()
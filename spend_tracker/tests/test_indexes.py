@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from spend_tracker.models import Currency, Unit
+from spend_tracker.views import TransactionViewSet, UnitViewSet
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ListIndexTests(TestCase):
+    """The filtered list querysets are planned on the indexes added for them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("index@example.com", "pw")
+        cls.currency = Currency.objects.create(name="USD", rate=1)
+        cls.unit = Unit.objects.create(
+            name="Cash", unit_type="ACCOUNT", currency=cls.currency, user=cls.user
+        )
+
+    def get_plan(self, viewset_class, params: dict) -> str:
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = self.user
+        view = viewset_class(
+            request=request, action="list", format_kwarg=None, args=(), kwargs={}
+        )
+        return view.get_queryset().explain()
+
+    def assertUsesIndex(self, viewset_class, params: dict, index: str):
+        plan = self.get_plan(viewset_class, params)
+        self.assertIn(index, plan, f"{params} is not planned on {index}:\n{plan}")
+
+    def test_transaction_date_range(self):
+        self.assertUsesIndex(
+            TransactionViewSet,
+            {"date_from": "2024-01-01", "date_to": "2024-01-31"},
+            "transaction_user_date_idx (user_id=? AND date_time>? AND date_time<?)",
+        )
+
+    def test_transaction_unit_type(self):
+        # The matching units are looked up first, then the user's transactions
+        for index in ("unit_user_type_idx", "transaction_user_date_idx"):
+            self.assertUsesIndex(TransactionViewSet, {"unit_type": "expense"}, index)
+
+    def test_transaction_currency(self):
+        for index in ("unit_user_currency_idx", "transaction_user_date_idx"):
+            self.assertUsesIndex(TransactionViewSet, {"currency": "usd"}, index)
+
+    def test_transaction_source_unit(self):
+        self.assertUsesIndex(
+            TransactionViewSet,
+            {"source_unit": self.unit.id},
+            "transaction_source_date_idx",
+        )
+
+    def test_transaction_destination_unit(self):
+        self.assertUsesIndex(
+            TransactionViewSet,
+            {"destination_unit": self.unit.id},
+            "transaction_dest_date_idx",
+        )
+
+    def test_transaction_amount_range(self):
+        self.assertUsesIndex(
+            TransactionViewSet,
+            {"amount_min": "10", "amount_max": "100"},
+            "transaction_user_amount_idx",
+        )
+
+    def test_unit_type(self):
+        self.assertUsesIndex(
+            UnitViewSet, {"unit_type": "account"}, "unit_user_type_idx"
+        )
+
+    def test_unit_currency(self):
+        self.assertUsesIndex(UnitViewSet, {"currency": "usd"}, "unit_user_currency_idx")
@@ -0,0 +1,125 @@
+import datetime
+import itertools
+import string
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from spend_tracker.helpers.currency_registry import registry
+from spend_tracker.models import Currency, DefaultCurrency, Transaction, Unit
+
+SIZES = (10, 100, 1000)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ListQueryCountTests(TestCase):
+    """List endpoints make the same number of queries however many rows they return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("queries@example.com", "pw")
+        cls.staff = get_user_model().objects.create_user(
+            "staff@example.com", "pw", is_staff=True
+        )
+        cls.currency = Currency.objects.create(name="AAA", rate=1)
+
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_units(self, start: int, stop: int) -> list[Unit]:
+        return Unit.objects.bulk_create(
+            Unit(
+                name=f"Unit {index}",
+                unit_type="ACCOUNT",
+                currency=self.currency,
+                user=self.user,
+            )
+            for index in range(start, stop)
+        )
+
+    def create_transactions(self, source, destination, start: int, stop: int):
+        now = timezone.now()
+        Transaction.objects.bulk_create(
+            Transaction(
+                date_time=now - datetime.timedelta(minutes=index),
+                source_unit=source,
+                destination_unit=destination,
+                source_amount=index,
+                destination_amount=index,
+                user=self.user,
+            )
+            for index in range(start, stop)
+        )
+
+    def create_currencies(self, start: int, stop: int) -> None:
+        names = itertools.islice(
+            itertools.product(string.ascii_uppercase, repeat=3), start, stop
+        )
+        Currency.objects.bulk_create(
+            Currency(name="".join(name), rate=1) for name in names
+        )
+
+    def create_default_currencies(self, start: int, stop: int) -> None:
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user-{index}@example.com")
+            for index in range(start, stop)
+        )
+        DefaultCurrency.objects.bulk_create(
+            DefaultCurrency(user=user, default_currency=self.currency) for user in users
+        )
+
+    def test_transaction_list(self):
+        source, destination = self.create_units(0, 2)
+        created = 0
+        for size in SIZES:
+            self.create_transactions(source, destination, created, size)
+            created = size
+            with self.subTest(rows=size):
+                with self.assertNumQueries(1):
+                    response = self.client.get("/api/spend-tracker/transaction/")
+                self.assertEqual(len(response.data["results"]), min(size, 100))
+
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        "/api/spend-tracker/transaction/", {"paginate": "false"}
+                    )
+                self.assertEqual(len(response.data), size)
+
+    def test_unit_list(self):
+        created = 0
+        for size in SIZES:
+            self.create_units(created, size)
+            created = size
+            with self.subTest(rows=size):
+                with self.assertNumQueries(1):
+                    response = self.client.get("/api/spend-tracker/unit/")
+                self.assertEqual(len(response.data), size)
+
+    def test_currency_list(self):
+        self.client.force_authenticate(self.staff)
+        created = 1
+        for size in SIZES:
+            self.create_currencies(created, size)
+            created = size
+            with self.subTest(rows=size):
+                with self.assertNumQueries(1):
+                    response = self.client.get("/api/spend-tracker/currency/")
+                self.assertEqual(len(response.data), size)
+
+    def test_default_currency_list(self):
+        # Staff see the default currencies of every user
+        self.client.force_authenticate(self.staff)
+        created = 0
+        for size in SIZES:
+            self.create_default_currencies(created, size)
+            created = size
+            with self.subTest(rows=size):
+                with self.assertNumQueries(1):
+                    response = self.client.get("/api/spend-tracker/default-currency/")
+                self.assertEqual(len(response.data), size)
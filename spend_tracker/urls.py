@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from spend_tracker import async_views
 from spend_tracker.views import (
     CurrencyViewSet,
     UnitViewSet,
     TransactionViewSet,
     DefaultCurrencyViewSet,
+    MonthlySummaryViewSet,
+    NetWorthViewSet,
+    StatementImportViewSet,
 )
 
 app_name = "spend_tracker"
@@ -15,7 +19,28 @@ router.register("currency", CurrencyViewSet, basename="currency")
 router.register("unit", UnitViewSet, basename="unit")
 router.register("transaction", TransactionViewSet, basename="transaction")
 router.register("default-currency", DefaultCurrencyViewSet, basename="default-currency")
+router.register("monthly-summary", MonthlySummaryViewSet, basename="monthly-summary")
+router.register("net-worth", NetWorthViewSet, basename="net-worth")
+router.register("statement-import", StatementImportViewSet, basename="statement-import")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path(
+        "async/transaction/",
+        async_views.transaction_list,
+        name="async-transaction-list",
+    ),
+    path(
+        "async/transaction/<int:pk>/",
+        async_views.transaction_detail,
+        name="async-transaction-detail",
+    ),
+    path("async/unit/", async_views.unit_list, name="async-unit-list"),
+    path("async/unit/<int:pk>/", async_views.unit_detail, name="async-unit-detail"),
+    path("async/currency/", async_views.currency_list, name="async-currency-list"),
+    path(
+        "async/currency/<int:pk>/",
+        async_views.currency_detail,
+        name="async-currency-detail",
+    ),
 ]
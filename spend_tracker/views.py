@@ -1,9 +1,48 @@
-from django.db import transaction
-from rest_framework import viewsets
-from rest_framework.exceptions import ValidationError
+import datetime
+import io
+
+from django.http import StreamingHttpResponse
+from django.db.models import DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-
-from spend_tracker.models import Currency, Unit, Transaction, DefaultCurrency
+from rest_framework.response import Response
+
+from spend_tracker.helpers.balances import (
+    apply_balance_deltas,
+    apply_transaction_batch,
+    get_balance_deltas,
+    get_transaction_deltas,
+    lock_transactions,
+    merge_balance_deltas,
+)
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.statement_import import import_statement
+from spend_tracker.helpers.rollups import (
+    apply_rollup_deltas,
+    get_month,
+    merge_rollup_deltas,
+)
+from spend_tracker.helpers.currency_registry import get_rates_version
+from spend_tracker.helpers.export import export_transactions
+from spend_tracker.helpers.net_worth import get_net_worth
+from spend_tracker.helpers.versions import (
+    bump_units_version_on_commit,
+    get_units_version,
+)
+from spend_tracker.filters import filter_transactions, filter_units
+from spend_tracker.mixins import VersionETagMixin
+from spend_tracker.models import (
+    Currency,
+    Unit,
+    Transaction,
+    DefaultCurrency,
+    MonthlyUnitTotal,
+    StatementImport,
+)
+from spend_tracker.pagination import TransactionCursorPagination
 from spend_tracker.serializers import (
     CurrencySerializer,
     TransactionSerializer,
@@ -12,20 +51,35 @@ from spend_tracker.serializers import (
     TransactionListSerializer,
     DefaultCurrencySerializer,
     DefaultCurrencyListSerializer,
+    TransactionBatchOperationSerializer,
+    MonthlyUnitTotalSerializer,
+    NetWorthSerializer,
+    StatementImportSerializer,
+    StatementUploadSerializer,
 )
 
 
-class CurrencyViewSet(viewsets.ModelViewSet):
+class CurrencyViewSet(VersionETagMixin, viewsets.ModelViewSet):
     permission_classes = (IsAdminUser,)
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
 
+    def get_etag_versions(self):
+        return [get_rates_version()]
+
 
-class DefaultCurrencyViewSet(viewsets.ModelViewSet):
+class DefaultCurrencyViewSet(VersionETagMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
 
+    def get_etag_versions(self):
+        # Staff responses span every user, so they are not versioned
+        if self.request.user.is_staff:
+            return None
+        user_id = self.request.user.id
+        return [user_id, get_units_version(user_id), get_rates_version()]
+
     def get_queryset(self):
-        queryset = DefaultCurrency.objects.all()
+        queryset = DefaultCurrency.objects.select_related("user", "default_currency")
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
         return queryset
@@ -45,18 +99,38 @@ class DefaultCurrencyViewSet(viewsets.ModelViewSet):
         serializer.instance = instance
 
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(VersionETagMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
 
+    def get_etag_versions(self):
+        # Staff responses span every user, so they are not versioned
+        if self.request.user.is_staff:
+            return None
+        user_id = self.request.user.id
+        return [
+            user_id,
+            get_units_version(user_id),
+            get_rates_version(),
+            get_month(tz=self.request.user.timezone),
+        ]
+
     def get_queryset(self):
-        queryset = Unit.objects.all()
-        unit_type = self.request.query_params.get("unit_type")
+        queryset = Unit.objects.select_related("user", "currency")
 
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
 
-        if unit_type:
-            queryset = queryset.filter(type=unit_type.upper())
+        if self.action == "list":
+            queryset = filter_units(queryset, self.request.query_params)
+
+        month_amount = MonthlyUnitTotal.objects.filter(
+            unit=OuterRef("pk"), month=get_month(tz=self.request.user.timezone)
+        ).values("amount")[:1]
+        queryset = queryset.annotate(
+            month_amount=Coalesce(
+                Subquery(month_amount), Value(0), output_field=DecimalField()
+            )
+        )
 
         return queryset.order_by("unit_type")
 
@@ -69,93 +143,272 @@ class UnitViewSet(viewsets.ModelViewSet):
 
 class TransactionViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
+    pagination_class = TransactionCursorPagination
 
     def get_queryset(self):
-        queryset = Transaction.objects.all()
+        queryset = Transaction.objects.select_related(
+            "user", "source_unit__currency", "destination_unit__currency"
+        )
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
-        return queryset.order_by("date_time")
+        if self.action in ("list", "export"):
+            queryset = filter_transactions(
+                queryset,
+                self.request.query_params,
+                user=None if self.request.user.is_staff else self.request.user,
+            )
+        return queryset.order_by("date_time", "id")
 
     def get_serializer_class(self):
-        return (
-            TransactionListSerializer
-            if self.action == "list"
-            else TransactionSerializer
+        if self.action == "list":
+            return TransactionListSerializer
+        if self.action == "batch":
+            return TransactionBatchOperationSerializer
+        return TransactionSerializer
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """Creates, updates and deletes many transactions at once.
+        Expects a list of `{"action": ..., "id": ..., "data": {...}}` operations.
+        Responds 409 without applying anything when another request changes or
+        deletes one of the transactions while the batch is validated.
+        """
+        operations = self.get_serializer(data=request.data, many=True)
+        operations.is_valid(raise_exception=True)
+
+        ids = [
+            operation["id"]
+            for operation in operations.validated_data
+            if operation["action"] != "create"
+        ]
+        if len(ids) != len(set(ids)):
+            raise ValidationError("Each transaction can appear only once in a batch.")
+        instances = self.get_queryset().in_bulk(ids)
+
+        creates, updates, deletes, errors = [], [], [], []
+        for operation in operations.validated_data:
+            instance = None
+            if operation["action"] != "create":
+                instance = instances.get(operation["id"])
+                if instance is None:
+                    errors.append(
+                        {"id": [f"Transaction {operation['id']} does not exist."]}
+                    )
+                    continue
+
+            if operation["action"] == "delete":
+                deletes.append(instance)
+                errors.append({})
+                continue
+
+            serializer = TransactionSerializer(
+                instance=instance,
+                data=operation["data"],
+                context=self.get_serializer_context(),
+            )
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            if instance is None:
+                creates.append(serializer.validated_data)
+            else:
+                updates.append((instance, serializer.validated_data))
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        created, updated = apply_transaction_batch(
+            request.user, creates, updates, deletes
+        )
+        return Response(
+            {
+                "created": TransactionSerializer(created, many=True).data,
+                "updated": TransactionSerializer(updated, many=True).data,
+                "deleted": [instance.id for instance in deletes],
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Streams transactions as CSV or NDJSON.
+        Supports `output` (`csv` or `ndjson`) and the filters of the list endpoint.
+        """
+        output = request.query_params.get("output", "csv")
+        lines = export_transactions(self.get_queryset(), output)
+        response = StreamingHttpResponse(
+            lines,
+            content_type="text/csv" if output == "csv" else "application/x-ndjson",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="transactions.{output}"'
         )
+        return response
 
-    @transaction.atomic
+    @immediate_atomic()
     def perform_create(self, serializer):
         data = serializer.validated_data
+        deltas = get_balance_deltas(
+            source_unit=data["source_unit"],
+            destination_unit=data["destination_unit"],
+            source_amount=data["source_amount"],
+            destination_amount=data["destination_amount"],
+        )
+        apply_balance_deltas(deltas)
+        instance = serializer.save(user=self.request.user)
 
-        # Operation for INCOME -> ACCOUNT
-        if (
-            data["source_unit"].unit_type == "INCOME"
-            and data["destination_unit"].unit_type == "ACCOUNT"
-        ):
-            data["source_unit"].amount += data["source_amount"]
-            data["destination_unit"].amount += data["destination_amount"]
-
-        # Operation for ACCOUNT -> ACCOUNT/EXPENSE
-        elif data["source_unit"].unit_type == "ACCOUNT" and data[
-            "destination_unit"
-        ].unit_type in (
-            "ACCOUNT",
-            "EXPENSE",
-        ):
-            data["source_unit"].amount -= data["source_amount"]
-            data["destination_unit"].amount += data["destination_amount"]
-
-        else:
-            raise ValidationError("Invalid transaction type combination.")
-
-        data["source_unit"].save()
-        data["destination_unit"].save()
-
-        serializer.save(user=self.request.user)
+        rollup = {}
+        merge_rollup_deltas(
+            rollup, deltas, instance.date_time, tz=instance.user.timezone
+        )
+        apply_rollup_deltas(instance.user_id, rollup)
+        bump_units_version_on_commit(instance.user_id)
 
-    @transaction.atomic
+    @immediate_atomic()
     def perform_update(self, serializer):
-
         data = serializer.validated_data
-        instance = serializer.instance
-
-        source_difference = instance.source_amount - data["source_amount"]
-        destination_difference = (
-            instance.destination_amount - data["destination_amount"]
-        )
-
-        # Operation for INCOME -> ACCOUNT
-        if (
-            data["source_unit"].unit_type == "INCOME"
-            and data["destination_unit"].unit_type == "ACCOUNT"
-        ):
-            data["source_unit"].amount -= source_difference
-            data["destination_unit"].amount -= destination_difference
-
-        # Operation for ACCOUNT -> ACCOUNT/EXPENSE
-        elif data["source_unit"].unit_type == "ACCOUNT" and data[
-            "destination_unit"
-        ].unit_type in (
-            "ACCOUNT",
-            "EXPENSE",
-        ):
-            data["source_unit"].amount += source_difference
-            data["destination_unit"].amount -= destination_difference
-
-        data["source_unit"].save()
-        data["destination_unit"].save()
+        # Read again under the write lock, another request may have changed it
+        instance = lock_transactions([serializer.instance.pk]).get(
+            serializer.instance.pk
+        )
+        if instance is None:
+            raise NotFound()
+        serializer.instance = instance
+
+        # Reverse the stored transaction and apply the new one
+        deltas = {}
+        merge_balance_deltas(deltas, get_transaction_deltas(instance), sign=-1)
+        merge_balance_deltas(
+            deltas,
+            get_balance_deltas(
+                source_unit=data.get("source_unit", instance.source_unit),
+                destination_unit=data.get(
+                    "destination_unit", instance.destination_unit
+                ),
+                source_amount=data.get("source_amount", instance.source_amount),
+                destination_amount=data.get(
+                    "destination_amount", instance.destination_amount
+                ),
+            ),
+        )
+        apply_balance_deltas(deltas)
+
+        rollup = {}
+        merge_rollup_deltas(
+            rollup, deltas, instance.date_time, tz=instance.user.timezone
+        )
+        apply_rollup_deltas(instance.user_id, rollup)
+        bump_units_version_on_commit(instance.user_id)
 
         serializer.save()
 
-    @transaction.atomic
+    @immediate_atomic()
     def perform_destroy(self, instance):
-        if instance.source_unit.unit_type == "INCOME":
-            instance.source_unit.amount -= instance.source_amount
-            instance.destination_unit.amount -= instance.destination_amount
-        else:
-            instance.source_unit.amount += instance.source_amount
-            instance.destination_unit.amount -= instance.destination_amount
-
-        instance.source_unit.save()
-        instance.destination_unit.save()
-        instance.delete()
+        # Only the request that deletes the row reverses its balances
+        instance = lock_transactions([instance.pk]).get(instance.pk)
+        if instance is None:
+            raise NotFound()
+        deleted, _ = Transaction.objects.filter(pk=instance.pk).delete()
+        if not deleted:
+            raise NotFound()
+
+        deltas = {}
+        merge_balance_deltas(deltas, get_transaction_deltas(instance), sign=-1)
+        apply_balance_deltas(deltas)
+
+        rollup = {}
+        merge_rollup_deltas(
+            rollup, deltas, instance.date_time, tz=instance.user.timezone
+        )
+        apply_rollup_deltas(instance.user_id, rollup)
+        bump_units_version_on_commit(instance.user_id)
+
+
+class MonthlySummaryViewSet(viewsets.ReadOnlyModelViewSet):
+    """Per-unit monthly totals, optionally filtered with `unit`, `unit_type`,
+    `from` and `to` (`YYYY-MM`) query parameters.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = MonthlyUnitTotalSerializer
+
+    def get_queryset(self):
+        queryset = MonthlyUnitTotal.objects.select_related("unit")
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+
+        params = self.request.query_params
+        if params.get("unit"):
+            queryset = queryset.filter(unit_id=self._parse_unit(params["unit"]))
+        if params.get("unit_type"):
+            queryset = queryset.filter(unit__unit_type=params["unit_type"].upper())
+        if params.get("from"):
+            queryset = queryset.filter(month__gte=self._parse_month(params["from"]))
+        if params.get("to"):
+            queryset = queryset.filter(month__lte=self._parse_month(params["to"]))
+
+        return queryset.order_by("month", "unit_id")
+
+    @staticmethod
+    def _parse_unit(value: str) -> int:
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError(f"Invalid unit '{value}', expected an id.")
+
+    @staticmethod
+    def _parse_month(value: str) -> datetime.date:
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m").date()
+        except ValueError:
+            raise ValidationError(f"Invalid month '{value}', expected YYYY-MM.")
+
+
+class NetWorthViewSet(viewsets.ViewSet):
+    """Totals per unit type and net worth in the user's default currency."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def list(self, request):
+        serializer = NetWorthSerializer(get_net_worth(request.user))
+        return Response(serializer.data)
+
+
+class StatementImportViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Imports CSV bank statements and reports their progress.
+    Uploading a statement with the name of an unfinished import resumes it,
+    and with the name of a finished one returns 409 Conflict.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return StatementImport.objects.filter(user=self.request.user).order_by("-id")
+
+    def get_serializer_class(self):
+        return (
+            StatementUploadSerializer
+            if self.action == "create"
+            else StatementImportSerializer
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        checkpoint = import_statement(
+            user=request.user,
+            lines=lines,
+            name=serializer.validated_data.get("name", upload.name),
+            columns=serializer.validated_data.get("columns"),
+        )
+        return Response(
+            StatementImportSerializer(checkpoint).data, status=status.HTTP_201_CREATED
+        )
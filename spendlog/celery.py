@@ -3,6 +3,9 @@ import os
 from django.conf import settings
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
+
+from spendlog import instrumentation
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "spendlog.settings")
@@ -18,6 +21,10 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Count queries and time of every task for the metrics endpoint.
+task_prerun.connect(instrumentation.task_started)
+task_postrun.connect(instrumentation.task_finished)
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
@@ -0,0 +1,251 @@
+import contextvars
+import heapq
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import ListSerializer
+
+from spendlog.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_QUERIES = 5
+
+_current = contextvars.ContextVar("spendlog_timings", default=None)
+
+
+class Timings:
+    """Timings of one request or task.
+    Also a database execute wrapper that counts and times every query
+    and keeps the slowest ones.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.stages = defaultdict(float)
+        self.active = set()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.slowest_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.query_time += duration
+            entry = (duration, self.query_count, sql)
+            if len(self.slowest_queries) < SLOWEST_QUERIES:
+                heapq.heappush(self.slowest_queries, entry)
+            else:
+                heapq.heappushpop(self.slowest_queries, entry)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    # Looked up per query, as the async ORM queries on another thread's connection
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def _install_execute_wrapper(sender, connection, **kwargs) -> None:
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+connection_created.connect(_install_execute_wrapper)
+
+
+@contextmanager
+def stage(name: str):
+    """Adds the time spent in the block to the `name` stage of the current request.
+    Nested blocks of the same stage are counted once.
+    """
+    timings = _current.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[name] += time.perf_counter() - started
+        timings.active.discard(name)
+
+
+class TimedSerializerMixin:
+    """Adds the validation and representation of a serializer, and of the list
+    serializer built for it by `many=True`, to the `serializer` stage.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
+
+    @property
+    def data(self):
+        with stage("serializer"):
+            return super().data
+
+    def is_valid(self, *, raise_exception=False):
+        with stage("serializer"):
+            return super().is_valid(raise_exception=raise_exception)
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    pass
+
+
+def _get_route(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "unmatched"
+
+
+class PerformanceMiddleware:
+    """Records SQL, serializer, authentication and view time of each request.
+    Adds them as a `Server-Timing` header, feeds the per-route metrics and
+    logs requests slower than `SLOW_REQUEST_THRESHOLD` with their slowest queries.
+    Serializers time themselves through `TimedSerializerMixin` and the JWT
+    authentication classes time the `auth` stage.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings: Timings):
+        total = timings.elapsed
+        if timings.view_started is not None:
+            timings.stages["view"] = time.perf_counter() - timings.view_started
+
+        response["Server-Timing"] = self._server_timing(timings, total)
+        self._record(request, response, timings, total)
+        if total >= settings.SLOW_REQUEST_THRESHOLD:
+            self._log_slow_request(request, response, timings, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    @staticmethod
+    def _server_timing(timings: Timings, total: float) -> str:
+        entries = [
+            f'db;dur={timings.query_time * 1000:.1f};desc="{timings.query_count} queries"'
+        ]
+        for name in ("auth", "serializer", "view"):
+            if name in timings.stages:
+                entries.append(f"{name};dur={timings.stages[name] * 1000:.1f}")
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    @staticmethod
+    def _record(request, response, timings: Timings, total: float) -> None:
+        labels = {"route": _get_route(request), "method": request.method}
+        registry.inc(
+            "spendlog_http_requests_total",
+            {**labels, "status": response.status_code},
+        )
+        registry.observe("spendlog_http_request_duration_seconds", labels, total)
+        registry.observe("spendlog_http_request_db_seconds", labels, timings.query_time)
+        registry.observe(
+            "spendlog_http_request_db_queries", labels, timings.query_count
+        )
+        registry.observe(
+            "spendlog_http_request_serializer_seconds",
+            labels,
+            timings.stages.get("serializer", 0.0),
+        )
+        registry.observe(
+            "spendlog_http_request_auth_seconds",
+            labels,
+            timings.stages.get("auth", 0.0),
+        )
+        registry.publish()
+
+    @staticmethod
+    def _log_slow_request(request, response, timings: Timings, total: float) -> None:
+        queries = "".join(
+            f"\n  {duration * 1000:.1f}ms {sql[:500]}"
+            for duration, _, sql in sorted(timings.slowest_queries, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s (%s) took %.1fms, %d queries in %.1fms%s",
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            total * 1000,
+            timings.query_count,
+            timings.query_time * 1000,
+            queries,
+        )
+
+
+_tasks = {}
+
+
+def task_started(task_id=None, **kwargs) -> None:
+    """Celery `task_prerun` handler that starts timing the task's queries."""
+    timings = Timings()
+    connection.execute_wrappers.append(timings)
+    _tasks[task_id] = timings
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs) -> None:
+    """Celery `task_postrun` handler that records the task's metrics."""
+    timings = _tasks.pop(task_id, None)
+    if timings is None:
+        return
+    if timings in connection.execute_wrappers:
+        connection.execute_wrappers.remove(timings)
+
+    labels = {"task": task.name if task else "unknown"}
+    registry.inc("spendlog_celery_tasks_total", {**labels, "state": state or "UNKNOWN"})
+    registry.observe("spendlog_celery_task_duration_seconds", labels, timings.elapsed)
+    registry.observe("spendlog_celery_task_db_seconds", labels, timings.query_time)
+    registry.observe("spendlog_celery_task_db_queries", labels, timings.query_count)
+    registry.publish()
@@ -0,0 +1,196 @@
+import os
+import socket
+import threading
+import time
+
+from django.core.cache import cache
+
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Name: (type, help, buckets)
+METRICS = {
+    "spendlog_http_requests_total": ("counter", "Requests by route and status.", None),
+    "spendlog_http_request_duration_seconds": (
+        "histogram",
+        "Request duration by route.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_http_request_db_seconds": (
+        "histogram",
+        "Time spent in SQL queries per request.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_http_request_db_queries": (
+        "histogram",
+        "SQL queries per request.",
+        QUERY_BUCKETS,
+    ),
+    "spendlog_http_request_serializer_seconds": (
+        "histogram",
+        "Time spent in serializers per request.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_http_request_auth_seconds": (
+        "histogram",
+        "Time spent authenticating per request.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_celery_tasks_total": ("counter", "Celery tasks by state.", None),
+    "spendlog_celery_task_duration_seconds": (
+        "histogram",
+        "Celery task duration.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_celery_task_db_seconds": (
+        "histogram",
+        "Time spent in SQL queries per Celery task.",
+        TIME_BUCKETS,
+    ),
+    "spendlog_celery_task_db_queries": (
+        "histogram",
+        "SQL queries per Celery task.",
+        QUERY_BUCKETS,
+    ),
+}
+
+PUBLISH_INTERVAL = 15
+SNAPSHOT_TIMEOUT = 5 * 60
+SNAPSHOT_KEY = "spendlog:metrics:{process}"
+PROCESSES_KEY = "spendlog:metrics:processes"
+
+
+class MetricsRegistry:
+    """Process-local counters and histograms.
+    Every process publishes a snapshot to the shared cache at most every
+    `PUBLISH_INTERVAL` seconds, and `collect` merges the snapshots of all
+    live processes, so web and Celery workers are reported together.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._values = {}
+        self._published_at = 0.0
+
+    def _check_fork(self) -> None:
+        # Values copied from the parent process belong to the parent
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def inc(self, name: str, labels: dict, value: float = 1) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._check_fork()
+            return {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in self._values.items()
+            }
+
+    def publish(self, force: bool = False) -> None:
+        """Writes this process's snapshot to the cache when it is due."""
+        now = time.monotonic()
+        if not force and now - self._published_at < PUBLISH_INTERVAL:
+            return
+        self._published_at = now
+        process = f"{socket.gethostname()}:{os.getpid()}"
+        try:
+            cache.set(
+                SNAPSHOT_KEY.format(process=process),
+                self.snapshot(),
+                timeout=SNAPSHOT_TIMEOUT,
+            )
+            processes = cache.get(PROCESSES_KEY) or set()
+            if process not in processes:
+                cache.set(PROCESSES_KEY, processes | {process}, timeout=None)
+        except Exception:
+            # Metrics must never break a request or a task
+            pass
+
+    def collect(self) -> dict:
+        """Returns the values of every process that published recently."""
+        self.publish(force=True)
+        processes = cache.get(PROCESSES_KEY) or set()
+        snapshots = cache.get_many(
+            [SNAPSHOT_KEY.format(process=process) for process in processes]
+        )
+        live = {
+            process
+            for process in processes
+            if SNAPSHOT_KEY.format(process=process) in snapshots
+        }
+        if live != processes:
+            cache.set(PROCESSES_KEY, live, timeout=None)
+
+        merged = {}
+        for snapshot in snapshots.values():
+            for key, value in snapshot.items():
+                if key not in merged:
+                    merged[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    merged[key] = [a + b for a, b in zip(merged[key], value)]
+                else:
+                    merged[key] += value
+        return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, **extra) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_metrics(values: dict) -> str:
+    """Formats merged values in the Prometheus text exposition format."""
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        series = sorted(
+            (labels, value)
+            for (metric, labels), value in values.items()
+            if metric == name
+        )
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in series:
+            if metric_type == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            for bound, count in zip(buckets, value):
+                lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {count}")
+            lines.append(
+                f"{name}_bucket{_format_labels(labels, le='+Inf')} {value[-1]}"
+            )
+            lines.append(f"{name}_sum{_format_labels(labels)} {value[-2]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,169 @@
+import datetime
+import functools
+import logging
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+TOP_FUNCTIONS = 25
+
+
+def _describe(code) -> str:
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the call stack of one thread from a background thread.
+    Stacks are counted in the folded format read by flamegraph.pl, speedscope
+    and inferno.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_describe(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def summary(self, limit: int = TOP_FUNCTIONS) -> str:
+        """Returns the functions with the most samples on top of and anywhere in the stack."""
+        total = sum(self.stacks.values()) or 1
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g}ms", ""]
+        for title, counter in (("Own time", own), ("Total time", inclusive)):
+            lines.append(f"{title}:")
+            for function, count in counter.most_common(limit):
+                lines.append(f"{count / total:7.1%} {count:7d}  {function}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def save(self, label: str) -> Path:
+        """Writes the folded stacks and the summary, returning the stacks' path."""
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = "-".join(
+            (
+                datetime.datetime.now().strftime("%Y%m%d-%H%M%S"),
+                re.sub(r"[^\w.-]+", "_", label),
+                uuid.uuid4().hex[:6],
+            )
+        )
+        path = directory / f"{name}.folded"
+        path.write_text(
+            "".join(
+                f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items()
+            )
+        )
+        (directory / f"{name}.txt").write_text(f"{label}\n{self.summary()}")
+        return path
+
+
+def _sampled(rate: float) -> bool:
+    return rate > 0 and random.random() < rate
+
+
+def _is_staff(request) -> bool:
+    # Runs before REST framework, so the JWT is checked here
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    from users.authentication import CachedJWTAuthentication
+
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError):
+        return False
+    user = result[0] if result else getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent by staff with an `X-Profile: 1` header, and a
+    `PROFILING_SAMPLE_RATE` share of all requests.
+    Not installed at all unless `PROFILING_ENABLED` is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = request.META.get(PROFILE_HEADER) == "1" and _is_staff(request)
+        if not requested and not _sampled(settings.PROFILING_SAMPLE_RATE):
+            return self.get_response(request)
+
+        profiler = SamplingProfiler(settings.PROFILING_INTERVAL)
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+
+        match = request.resolver_match
+        path = profiler.save(
+            f"{request.method}-{match.view_name if match else 'unmatched'}"
+        )
+        logger.info("Profiled %s %s to %s", request.method, request.path, path)
+        if requested:
+            response["X-Profile"] = path.name
+        return response
+
+
+def profile_task(function):
+    """Profiles a `PROFILING_TASK_SAMPLE_RATE` share of the runs of a Celery task.
+    Apply it below `shared_task`, so the task keeps its name.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not settings.PROFILING_ENABLED or not _sampled(
+            settings.PROFILING_TASK_SAMPLE_RATE
+        ):
+            return function(*args, **kwargs)
+
+        profiler = SamplingProfiler(settings.PROFILING_INTERVAL)
+        profiler.start()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.stop()
+            path = profiler.save(f"task-{function.__module__}.{function.__name__}")
+            logger.info("Profiled task %s to %s", function.__name__, path)
+
+    return wrapper
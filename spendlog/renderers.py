@@ -0,0 +1,60 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """Encodes types that are not native to orjson or MessagePack as REST
+    framework's encoder does, so the wire format stays the same: datetimes
+    with a `Z` suffix, lazy strings, UUIDs, querysets and so on. Serializers
+    already turn `DecimalField` values into strings.
+    """
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in replacement for `JSONRenderer` that encodes with orjson.
+    Output is byte for byte the same, except that any requested indent
+    is rendered as two spaces.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=encode_default, option=options)
+        # Escapes U+2028 and U+2029 like `JSONRenderer`
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack for clients that send `Accept: application/msgpack`.
+    Values are encoded as in JSON, so decimals stay strings.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from spendlog.views import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/user/", include("users.urls", namespace="user")),
     path("api/spend-tracker/", include("spend_tracker.urls", namespace="money")),
+    path("api/metrics/", metrics, name="metrics"),
 ]
@@ -0,0 +1,91 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Seconds a process trusts its own copy before checking the version again
+LOCAL_TIMEOUT = 5
+CACHE_TIMEOUT = 60 * 60
+# Users a process keeps its own copy of, least recently used ones are dropped
+MAX_LOCAL_USERS = 1000
+
+# User id: (version, checked at, pickled user), least recently used first
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _user_version_key(user_id) -> str:
+    return f"users:user_version:{user_id}"
+
+
+def _user_key(user_id, version: int) -> str:
+    return f"users:user:{user_id}:{version}"
+
+
+def get_user_version(user_id) -> int:
+    """Returns the version of the cached copies of a user."""
+    return cache.get_or_set(_user_version_key(user_id), 1, timeout=None)
+
+
+def bump_user_version(user_id) -> None:
+    """Invalidates every cached copy of a user."""
+    with _local_lock:
+        _local.pop(str(user_id), None)
+    try:
+        cache.incr(_user_version_key(user_id))
+    except ValueError:
+        cache.add(_user_version_key(user_id), 2, timeout=None)
+
+
+def bump_user_version_on_commit(user_id) -> None:
+    transaction.on_commit(partial(bump_user_version, user_id))
+
+
+def _remember(key: str, entry: tuple) -> None:
+    with _local_lock:
+        _local[key] = entry
+        _local.move_to_end(key)
+        while len(_local) > MAX_LOCAL_USERS:
+            _local.popitem(last=False)
+
+
+def get_cached_user(user_id):
+    """Returns the user with the `USER_ID_FIELD` value `user_id`, or None.
+    A process keeps its copy for `LOCAL_TIMEOUT` seconds, then revalidates it
+    against the version in the shared cache, and only loads the user from the
+    database when the version has changed. At most `MAX_LOCAL_USERS` copies are
+    kept, the least recently used going first. Every call returns a new instance,
+    so a request can modify its user without affecting others.
+    """
+    key = str(user_id)
+    now = time.monotonic()
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is not None:
+            _local.move_to_end(key)
+    if entry is not None and now - entry[1] < LOCAL_TIMEOUT:
+        return pickle.loads(entry[2])
+
+    version = get_user_version(user_id)
+    if entry is not None and entry[0] == version:
+        _remember(key, (version, now, entry[2]))
+        return pickle.loads(entry[2])
+
+    data = cache.get(_user_key(user_id, version))
+    if data is None:
+        model = get_user_model()
+        try:
+            user = model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except model.DoesNotExist:
+            return None
+        data = pickle.dumps(user, pickle.HIGHEST_PROTOCOL)
+        cache.set(_user_key(user_id, version), data, timeout=CACHE_TIMEOUT)
+    _remember(key, (version, now, data))
+    return pickle.loads(data)
@@ -1,3 +1,8 @@
+import functools
+import zoneinfo
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
@@ -35,11 +40,30 @@ class UserManager(DjangoUserManager):
         return self._create_user(email, password, **extra_fields)
 
 
+@functools.cache
+def get_available_timezones() -> frozenset[str]:
+    # `available_timezones` scans the time zone database on every call
+    return frozenset(zoneinfo.available_timezones())
+
+
+def validate_timezone(value):
+    if value not in get_available_timezones():
+        raise ValidationError(
+            _("Unknown time zone '%(value)s'."), params={"value": value}
+        )
+
+
 class User(AbstractUser):
     """User model."""
 
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    timezone = models.CharField(
+        _("time zone"),
+        max_length=64,
+        default=settings.TIME_ZONE,
+        validators=[validate_timezone],
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -0,0 +1,13 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import bump_user_version_on_commit
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Covers profile updates, password changes and deactivation in the admin."""
+    bump_user_version_on_commit(getattr(instance, api_settings.USER_ID_FIELD))
@@ -4,6 +4,8 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.settings import api_settings
 
+from spend_tracker.helpers.db import immediate_atomic
+from spend_tracker.helpers.rollups import rebuild_monthly_totals
 from users.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -24,3 +26,11 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+    @immediate_atomic()
+    def perform_update(self, serializer):
+        old_timezone = serializer.instance.timezone
+        user = serializer.save()
+        # Monthly totals are bucketed in the owner's time zone
+        if user.timezone != old_timezone:
+            rebuild_monthly_totals(user)